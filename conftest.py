@@ -1,17 +1,138 @@
+import contextlib
+import hashlib
 import os
 import platform
 import shutil
+import sys
+import time
+import uuid
 
-import allure
 import pytest
-from playwright.sync_api import sync_playwright
 
+from test_data.orange_hrm_db_data import EMPLOYEES, SEED_TABLES, SQLITE_SCHEMA
 from utils.config_reader import get_path
-from utils.ui_utils.orange_hrm.orange_hrm_utils import OrangeHRMUtils
+from utils.db_client import DBClient, DBConnectionPool, seed_once
+from utils.har_manager import HarManager
+from utils.ui_client import UIClient
+
+# Heavy modules (playwright, allure, numpy, the page-object stack) are imported
+# inside the fixtures that need them so collection does not pay for them.
+
+
+def pytest_configure(config):
+    # One id per run; xdist workers inherit it from the controller's environment
+    os.environ.setdefault("E2E_RUN_ID", uuid.uuid4().hex[:12])
+    global _config
+    _config = config
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # Only shut the pool down if some test actually ran a visual check
+    visual_compare = sys.modules.get("utils.visual_compare")
+    if visual_compare is not None:
+        visual_compare.shutdown_pool()
+
+    # Every worker merges the element latencies it observed into the shared table
+    adaptive_timeout = sys.modules.get("utils.adaptive_timeout")
+    if adaptive_timeout is not None:
+        adaptive_timeout.get_store().save()
+
+    locator_healing = sys.modules.get("utils.locator_healing")
+    if locator_healing is not None:
+        locator_healing.save_index()
+
+    # Only the controller (or a plain non-xdist run) aggregates per-worker output
+    # and removes the session seed, after every worker has finished using it
+    if hasattr(session.config, "workerinput"):
+        return
+
+    from utils import trace_analyzer
+    trace_analyzer.write_session_summary()
+
+    seed_key = f"orange_hrm_seed_{os.environ['E2E_RUN_ID']}"
+    done_file = os.path.join(get_path("db_dir"), "locks", f"{seed_key}.done")
+    if not os.path.exists(done_file):
+        return
+    pool = DBConnectionPool()
+    try:
+        DBClient(pool, tag=f"session_{os.environ['E2E_RUN_ID']}").cleanup(tables=SEED_TABLES)
+    finally:
+        pool.close_all()
+        os.remove(done_file)
+
+
+# ---------------------------------------------------------
+# Run history (outcome / duration / retries per test)
+# ---------------------------------------------------------
+_run_results = {}
+_config = None
+
+
+def _record_history() -> bool:
+    # xdist replays every worker report on the controller ("dsession" plugin);
+    # workers record the history themselves, with their own retry counts
+    return _config is None or not _config.pluginmanager.hasplugin("dsession")
+
+
+def pytest_runtest_logreport(report):
+    if not _record_history():
+        return
+    result = _run_results.setdefault(report.nodeid, {"outcome": "passed", "duration": 0.0, "reruns": 0})
+    result["duration"] += report.duration
+    if report.outcome == "rerun":
+        # pytest-rerunfailures: the next attempt starts from a clean outcome
+        result["outcome"] = "passed"
+        result["reruns"] += 1
+    elif report.failed:
+        result["outcome"] = "failed" if report.when == "call" else "error"
+    elif report.skipped and result["outcome"] == "passed":
+        result["outcome"] = "skipped"
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    # Called once per test after all phases and reruns
+    if not _record_history():
+        return
+    from utils.config_reader import get_config_value
+    from utils.decorators import RETRY_ATTEMPTS
+
+    result = _run_results.pop(nodeid, None)
+    attempts = RETRY_ATTEMPTS.pop(nodeid, 1)
+    enabled = os.environ.get("E2E_RUN_HISTORY") or get_config_value("RUN_HISTORY", "enabled")
+    if result is None or enabled.lower() != "true":
+        return
+
+    # numpy is only loaded when history is recorded
+    from utils import run_history
+    run_history.append_result(
+        os.environ["E2E_RUN_ID"], nodeid, result["outcome"], result["duration"],
+        retries=result["reruns"] + attempts - 1, timestamp=time.time(),
+    )
+
+
+def _attach_trace_summary(trace_file, node_name):
+    """
+    Slowest actions, largest resources and console errors of the trace,
+    attached to the test and collected for the session summary.
+    """
+    from utils.config_reader import get_config_value
+    if get_config_value("TRACE_ANALYSIS", "enabled").lower() != "true":
+        return
+
+    from utils import trace_analyzer
+    try:
+        result = trace_analyzer.analyze_trace(trace_file, int(get_config_value("TRACE_ANALYSIS", "top")))
+    except Exception as e:
+        print(f"⚠️ Could not analyse trace {trace_file}: {e}")
+        return
+    UIClient.attach_ui_data(f"Trace Summary {node_name}", result)
+    trace_analyzer.record_summary(result, os.environ.get("PYTEST_XDIST_WORKER", "main"))
 
 
 @pytest.fixture(scope="session")
 def playwright_context():
+    from playwright.sync_api import sync_playwright
+
     # Start Playwright once for the session
     p = sync_playwright().start()
     yield p
@@ -27,7 +148,10 @@ def playwright_ui(request, playwright_context):
     4. Yields control to the test
     5. After test ends, stops tracing
     6. Attaches trace and video files to Allure report
+    7. Records or replays network traffic as HAR when [HAR] mode is set
+    8. Caps browsers per host, throttles launches and reports peak memory
     """
+    from utils import resource_governor
 
     # -----------------------------------------------------
     # Step 1: Detect the OS (needed for headless/args config)
@@ -56,75 +180,198 @@ def playwright_ui(request, playwright_context):
 
     # -----------------------------------------------------
     # Step 3: Launch Playwright browser (maximized)
+    # Waits for host headroom and a free browser slot first.
+    # Every teardown step is registered on an ExitStack right after the
+    # resource exists; they run in reverse order and each one runs even if
+    # a setup step or an earlier teardown step raised, so the browser, the
+    # slot and the sampler thread are never leaked.
     # -----------------------------------------------------
-    browser = playwright_context.chromium.launch(
-        headless=is_linux,        # Run headless if Linux
-        args=["--start-maximized"]  # Open browser in full window
-    )
-
-    # -----------------------------------------------------
-    # Step 4: Create new browser context & page
-    # -----------------------------------------------------
-    context = browser.new_context(
-        no_viewport=True,                   # Prevent Playwright from resizing window
-        ignore_https_errors=True,           # Ignore SSL warnings
-        record_video_dir=get_path("video_dir")  # Store recorded video in video_dir
-    )
-
-    page = context.new_page()
+    throttled_s = resource_governor.wait_for_headroom()
+    record_video = resource_governor.video_enabled(request)
+    sampler = resource_governor.ResourceSampler()
 
-    # -----------------------------------------------------
-    # Step 5: Start tracing (captures screenshots, DOM state)
-    # -----------------------------------------------------
-    page.context.tracing.start(
-        screenshots=True,
-        snapshots=True
-    )
+    with contextlib.ExitStack() as teardown:
+        slot = resource_governor.BrowserSlot().acquire()
+        teardown.callback(_report_resources, request, sampler, throttled_s, record_video)
+        teardown.callback(slot.release)
 
-    # -----------------------------------------------------
-    # Step 6: Yield page to the test function
-    # (This is where your test actually runs)
-    # -----------------------------------------------------
-    try:
-        yield page
+        browser = playwright_context.chromium.launch(
+            headless=is_linux,        # Run headless if Linux
+            args=resource_governor.launch_args(["--start-maximized"])  # Open browser in full window
+        )
+        teardown.callback(browser.close)
+        sampler.start()
 
-    finally:
         # -------------------------------------------------
-        # Step 7: Stop tracing & save trace file
+        # Step 4: Create new browser context & page
         # -------------------------------------------------
-        trace_file = f"{get_path('traces_dir')}/{request.node.name}_files.zip"
-        context.tracing.stop(path=trace_file)
+        context = browser.new_context(
+            no_viewport=True,                   # Prevent Playwright from resizing window
+            ignore_https_errors=True,           # Ignore SSL warnings
+            record_video_dir=get_path("video_dir") if record_video else None  # Store recorded video in video_dir
+        )
+        # HAR record/replay: @pytest.mark.har("flow") shares one recording across tests.
+        # Playwright writes the recording on context.close(), so finalize runs after it
+        har_marker = request.node.get_closest_marker("har")
+        har = HarManager(har_marker.args[0] if har_marker and har_marker.args else request.node.name)
+        teardown.callback(har.finalize)
+        teardown.callback(context.close)
+        har.attach(context)
 
-        # -------------------------------------------------
-        # Step 8: Attach trace to Allure report
-        # -------------------------------------------------
-        if os.path.exists(trace_file):
-            with open(trace_file, "rb") as f:
-                allure.attach(
-                    f.read(),
-                    name=f"Trace_{request.node.name}.zip",
-                    attachment_type="application/zip"
-                )
+        page = context.new_page()
+        teardown.callback(_attach_video, page, request.node.name, record_video)
+        teardown.callback(page.close)
 
         # -------------------------------------------------
-        # Step 9: Attach video to Allure report
+        # Step 5: Start tracing (captures screenshots, DOM state)
         # -------------------------------------------------
-        page.close()
-        video_path = page.video.path()
-        if os.path.exists(video_path):
-            with open(video_path, "rb") as f:
-                allure.attach(
-                    f.read(),
-                    name=f"Video_{request.node.name}.webm",
-                    attachment_type="video/webm"
-                )
+        page.context.tracing.start(
+            screenshots=True,
+            snapshots=True
+        )
+        teardown.callback(_save_trace, context, request.node.name)
 
         # -------------------------------------------------
-        # Step 10: Close browser context
+        # Step 6: Yield page to the test function
+        # (This is where your test actually runs)
         # -------------------------------------------------
-        context.close()
-        browser.close()
+        yield page
+
+
+def _save_trace(context, node_name):
+    """
+    Stops tracing, attaches the trace zip and its summary to the Allure report.
+    """
+    import allure
+
+    trace_file = f"{get_path('traces_dir')}/{node_name}_files.zip"
+    context.tracing.stop(path=trace_file)
+    if os.path.exists(trace_file):
+        with open(trace_file, "rb") as f:
+            allure.attach(
+                f.read(),
+                name=f"Trace_{node_name}.zip",
+                attachment_type="application/zip"
+            )
+        _attach_trace_summary(trace_file, node_name)
+
+
+def _attach_video(page, node_name, record_video):
+    """
+    Attaches the recorded video; Playwright finishes writing it when the page closes.
+    """
+    import allure
+
+    video_path = page.video.path() if record_video and page.video else ""
+    if os.path.exists(video_path):
+        with open(video_path, "rb") as f:
+            allure.attach(
+                f.read(),
+                name=f"Video_{node_name}.webm",
+                attachment_type="video/webm"
+            )
+
+
+def _report_resources(request, sampler, throttled_s, record_video):
+    """
+    Stops the sampler and reports peak browser memory / CPU.
+    """
+    usage = sampler.stop()
+    usage["throttled_s"] = round(throttled_s, 1)
+    usage["video"] = record_video
+    request.node.user_properties.append(("peak_rss_mb", usage["peak_rss_mb"]))
+    UIClient.attach_ui_data(f"Browser Resources {request.node.name}", usage)
+
+
+@pytest.fixture
+def orange_hrm_utils(request, playwright_ui):
+    from utils.ui_utils.orange_hrm.orange_hrm_utils import OrangeHRMUtils
+
+    start = time.perf_counter()
+    utils = OrangeHRMUtils(playwright_ui)
+    construct_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    yield utils
+
+    # Page objects are built lazily, so report only the ones this test used
+    UIClient.attach_ui_data(f"Fixture Timings {request.node.name}", {
+        "orange_hrm_utils_ms": construct_ms,
+        "page_objects_ms": utils.page_build_times,
+        "page_objects_available": sorted(utils.page_registry),
+    })
+
+    # Broken primary locators that were rescued by a fallback selector
+    from utils import locator_healing
+    if locator_healing.fallback_uses:
+        UIClient.attach_ui_data(f"Locator Fallbacks {request.node.name}", {"fallbacks": locator_healing.fallback_uses})
+        locator_healing.fallback_uses.clear()
+
+    # Queued (wait=False) visual checks the test did not verify itself
+    utils.verify_pending_visuals()
+
+
 
 @pytest.fixture
-def orange_hrm_utils(playwright_ui):
-    return OrangeHRMUtils(playwright_ui)
\ No newline at end of file
+def tab_manager(playwright_ui):
+    """
+    Extra tabs in the test's browser context; closes them and any orphaned
+    popups after the test instead of leaving them open until context.close().
+    """
+    from utils.tab_manager import TabManager
+
+    manager = TabManager(playwright_ui.context, main_page=playwright_ui)
+    yield manager
+    try:
+        manager.verify_pending_visuals()
+    finally:
+        manager.close_all()
+
+# ---------------------------------------------------------
+# DB fixtures (test-data seeding / teardown)
+# ---------------------------------------------------------
+@pytest.fixture(scope="session")
+def db_pool():
+    pool = DBConnectionPool()
+    yield pool
+    pool.close_all()
+
+
+@pytest.fixture(scope="session")
+def db_seed(db_pool):
+    """
+    Bulk seeds shared test data once per run, even with xdist.
+    Rows are tagged 'session_<run id>' and removed in pytest_sessionfinish.
+    """
+    run_id = os.environ["E2E_RUN_ID"]
+    client = DBClient(db_pool, tag=f"session_{run_id}")
+
+    def seed():
+        if db_pool.engine == "sqlite":
+            for ddl in SQLITE_SCHEMA:
+                client.execute(ddl)
+        client.bulk_insert("hs_hr_employee", EMPLOYEES)
+
+    seed_once(os.path.join(get_path("db_dir"), "locks"), f"orange_hrm_seed_{run_id}", seed)
+    return client
+
+
+@pytest.fixture(scope="function")
+def db_client(request, db_pool, db_seed):
+    """
+    Committed, tagged inserts visible to the UI; removed after the test.
+    """
+    # nodeid hash keeps tags unique (and short) even for long parametrized names
+    node_hash = hashlib.sha1(request.node.nodeid.encode()).hexdigest()[:16]
+    client = DBClient(db_pool, tag=f"{os.environ['E2E_RUN_ID']}_{node_hash}")
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="function")
+def db_transaction(db_pool, db_seed):
+    """
+    Single connection whose changes are rolled back after the test.
+    """
+    client = DBClient(db_pool, transactional=True)
+    yield client
+    client.close()
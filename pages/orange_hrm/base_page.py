@@ -1,22 +1,58 @@
+import os
+import shutil
 import time
 
+import allure
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError, expect,Dialog
+
+from utils import adaptive_timeout, locator_healing
+from utils.config_reader import get_config_value
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def verify_pending_visuals(page_objects):
+    """
+    Asserts the queued (wait=False) visual checks of every given page object.
+    Fixtures call it at teardown, so a test that never calls verify_visuals()
+    cannot pass with differing screenshots.
+    """
+    failures = []
+    for page_obj in page_objects:
+        if not getattr(page_obj, "pending_visuals", None):
+            continue
+        try:
+            page_obj.verify_visuals()
+        except AssertionError as e:
+            failures.append(str(e))
+    assert not failures, "\n".join(failures)
+
+
 class BasePage:
     def __init__(self, page):
         self.page = page
+        self.pending_visuals = []
 
     # ----------------------
     # Low level waits
     # ----------------------
-    def wait_for_element_to_locate(self, locator, timeout: int = 10000, retries: int = 2) -> bool:
+    def wait_for_element_to_locate(self, locator, timeout: int = None, retries: int = 2) -> bool:
         """
         Try to wait for given locator to be visible by retrying a few times.
+        timeout defaults to the learned timeout for string locators (utils.adaptive_timeout)
+        and to 10 s for Locator objects, which callers have already waited for.
         Returns True if located, False otherwise.
         """
+        # Latencies are only recorded by wait_for_element, this wait usually follows it
+        if isinstance(locator, str):
+            timeout = adaptive_timeout.timeout_for(locator, timeout)
+        elif timeout is None:
+            timeout = 10000
         for attempt in range(retries):
             try:
                 # Playwright Locator object expected as locator (string or Locator)
-                loc = self.page.locator(locator) if isinstance(locator, str) else locator
+                loc = self._locate(locator) if isinstance(locator, str) else locator
                 loc.wait_for(state="visible", timeout=timeout)
                 # scroll into view if needed
                 try:
@@ -36,21 +72,33 @@ class BasePage:
         print("element not located within timeout.")
         return False
 
-    def wait_for_element(self, locator, timeout: int = 100000):
+    def wait_for_element(self, locator, timeout: int = None):
         """
         Waits for the first visible element matching the locator on the main page.
+        timeout defaults to the learned timeout for this locator (utils.adaptive_timeout).
         Returns the element (Locator) if found or raises TimeoutError.
         """
-        end_time = time.time() + (timeout / 1000)
+        timeout = adaptive_timeout.timeout_for(locator, timeout)
+        start = time.time()
+        end_time = start + (timeout / 1000)
+        chain = locator_healing.chain_for(locator)
         loc = self.page.locator(locator)
 
         while time.time() < end_time:
             try:
+                if chain:
+                    # Probe the whole fallback chain in one round trip to the page
+                    healed = self._heal(locator, chain)
+                    if healed is None:
+                        time.sleep(0.2)
+                        continue
+                    loc = self.page.locator(healed)
                 count = loc.count()
                 for i in range(count):
                     el = loc.nth(i)
                     try:
                         el.wait_for(state="visible", timeout=500)
+                        adaptive_timeout.record(locator, (time.time() - start) * 1000)
                         return el
                     except Exception:
                         continue
@@ -58,14 +106,35 @@ class BasePage:
                 pass
             time.sleep(0.2)
 
-        raise PlaywrightTimeoutError(f"No visible element found for locator '{locator}' on main page.")
+        adaptive_timeout.record_timeout(locator, timeout)
+        raise PlaywrightTimeoutError(f"No visible element found for locator '{locator}' on main page within {timeout:.0f} ms.")
 
-    def wait_for_element_on_frame(self, frame_name: str, locator: str, timeout: int = 10000):
+    def _heal(self, locator: str, chain: list):
+        """
+        Returns the Playwright selector of the first chain entry with a visible match, or None.
+        """
+        index = self.page.evaluate(locator_healing.PROBE_JS, locator_healing.probe_specs(chain))
+        if index < 0:
+            return None
+        locator_healing.remember(locator, chain[index])
+        return locator_healing.resolved(locator)
+
+    def _locate(self, locator, **kwargs):
+        """
+        page.locator() using the selector that resolved for this locator (see utils.locator_healing).
+        """
+        return self.page.locator(locator_healing.resolved(locator), **kwargs)
+
+    def wait_for_element_on_frame(self, frame_name: str, locator: str, timeout: int = None):
         """
         Waits for the first visible element matching the locator inside the given frame.
+        timeout defaults to the learned timeout for this frame/locator pair.
         Returns the element (Locator) if found or raises TimeoutError.
         """
-        end_time = time.time() + (timeout / 1000)
+        key = f"{frame_name}::{locator}"
+        timeout = adaptive_timeout.timeout_for(key, timeout)
+        start = time.time()
+        end_time = start + (timeout / 1000)
         frame = self.page.frame(name=frame_name)
         if not frame:
             raise Exception(f"Frame '{frame_name}' not found.")
@@ -79,6 +148,7 @@ class BasePage:
                     el = loc.nth(i)
                     try:
                         el.wait_for(state="visible", timeout=500)
+                        adaptive_timeout.record(key, (time.time() - start) * 1000)
                         return el
                     except Exception:
                         continue
@@ -86,7 +156,8 @@ class BasePage:
                 pass
             time.sleep(0.2)
 
-        raise PlaywrightTimeoutError(f"No visible element found for locator '{locator}' in frame '{frame_name}'.")
+        adaptive_timeout.record_timeout(key, timeout)
+        raise PlaywrightTimeoutError(f"No visible element found for locator '{locator}' in frame '{frame_name}' within {timeout:.0f} ms.")
 
     # ----------------------
     # Locator helpers
@@ -96,7 +167,7 @@ class BasePage:
         Waits for element and returns a Playwright Locator for the given locator on main page.
         """
         self.wait_for_element(locator)
-        return self.page.locator(locator)
+        return self._locate(locator)
 
     def get_locator_on_frame(self, locator: str, frame_name: str):
         """
@@ -111,7 +182,7 @@ class BasePage:
     # ----------------------
     def click(self, locator: str):
         self.wait_for_element(locator)
-        loc = self.page.locator(locator)
+        loc = self._locate(locator)
         if self.wait_for_element_to_locate(loc):
             loc.click(force=True)
         else:
@@ -144,7 +215,7 @@ class BasePage:
         Click locator which has specific visible text
         """
         self.wait_for_element(locator)
-        loc = self.page.locator(locator, has_text=f"{text}")
+        loc = self._locate(locator, has_text=f"{text}")
         if self.wait_for_element_to_locate(loc):
             loc.click()
         else:
@@ -155,7 +226,7 @@ class BasePage:
     # ----------------------
     def fill_text(self, locator: str, value: str):
         self.wait_for_element(locator)
-        loc = self.page.locator(locator)
+        loc = self._locate(locator)
         if self.wait_for_element_to_locate(loc):
             loc.fill(value, force=True)
         else:
@@ -172,7 +243,7 @@ class BasePage:
 
     def type_text(self, locator: str, value: str):
         self.wait_for_element(locator)
-        loc = self.page.locator(locator)
+        loc = self._locate(locator)
         if self.wait_for_element_to_locate(loc):
             loc.type(value)
         else:
@@ -180,7 +251,7 @@ class BasePage:
 
     def set_input_files(self, locator: str, file):
         self.wait_for_element(locator)
-        loc = self.page.locator(locator)
+        loc = self._locate(locator)
         if self.wait_for_element_to_locate(loc):
             loc.set_input_files(file)
         else:
@@ -200,13 +271,13 @@ class BasePage:
     # ----------------------
     def get_inner_text(self, locator: str) -> str:
         self.wait_for_element(locator)
-        loc = self.page.locator(locator)
+        loc = self._locate(locator)
         if self.wait_for_element_to_locate(loc):
             return loc.inner_text()
         else:
             raise Exception("Element not found .")
 
-    def get_inner_text_on_frame(self, locator: str, frame_name: str, timeout: int = 10000) -> str:
+    def get_inner_text_on_frame(self, locator: str, frame_name: str, timeout: int = None) -> str:
         self.wait_for_element_on_frame(frame_name, locator, timeout=timeout)
         frame = self.page.frame(name=frame_name)
         loc = frame.locator(locator)
@@ -220,7 +291,7 @@ class BasePage:
     # ----------------------
     def select_option(self, locator: str, value):
         self.wait_for_element(locator)
-        self.page.locator(locator).select_option(value)
+        self._locate(locator).select_option(value)
 
     def select_option_on_frame(self, frame_name: str, locator: str, value):
         self.wait_for_element_on_frame(frame_name, locator)
@@ -233,11 +304,11 @@ class BasePage:
 
     def is_visible(self, locator: str) -> bool:
         self.wait_for_element(locator)
-        return self.page.locator(locator).is_visible()
+        return self._locate(locator).is_visible()
 
     def select_dropdown_by_label(self, locator: str, visible_text: str):
         self.wait_for_element(locator)
-        self.page.locator(locator).select_option(label=visible_text)
+        self._locate(locator).select_option(label=visible_text)
 
     # ----------------------
     # Alert / Dialog helpers
@@ -322,7 +393,7 @@ class BasePage:
         self.page.once("dialog", lambda dialog: dialog.accept())
         self.wait_for_element(remove_locator)
         # Click on "Remove" button
-        self.page.locator(remove_locator).click()
+        self._locate(remove_locator).click()
 
         # Handle second popup - get text, accept
         def second_popup(dialog: Dialog):
@@ -346,7 +417,7 @@ class BasePage:
     # ----------------------
     def get_text_from_multiple_elements(self, locator: str):
         self.wait_for_element(locator)
-        locator_obj = self.page.locator(locator)
+        locator_obj = self._locate(locator)
         all_text = locator_obj.all_text_contents()
         return all_text
 
@@ -376,4 +447,66 @@ class BasePage:
         context = self.page.context
         with context.expect_page(timeout=timeout) as new_page_info:
             self.click_on_frame(locator, frame_name)
-        return new_page_info.value
\ No newline at end of file
+        return new_page_info.value
+
+    # ----------------------
+    # Visual regression helpers
+    # ----------------------
+    def assert_visual(self, name: str, locator: str = None, wait: bool = True):
+        """
+        Screenshot the page (or the element for locator) and compare it with the stored baseline.
+        First run (or update_baselines = true) stores the capture as the new baseline.
+        wait=False queues the comparison on the background process pool; call
+        verify_visuals() later to collect and assert the queued results (the
+        orange_hrm_utils / tab_manager fixtures assert anything left at teardown).
+        """
+        # numpy/Pillow are only loaded by tests that do visual checks
+        from utils import visual_compare
+
+        paths = visual_compare.visual_paths(name)
+        if locator:
+            self.wait_for_element(locator)
+            self._locate(locator).first.screenshot(path=paths["actual"], animations="disabled", caret="hide")
+        else:
+            self.page.screenshot(path=paths["actual"], full_page=True, animations="disabled", caret="hide")
+
+        update = get_config_value("VISUAL", "update_baselines").lower() == "true"
+        if update or not os.path.exists(paths["baseline"]):
+            shutil.copyfile(paths["actual"], paths["baseline"])
+            logger.info(f"Visual baseline stored for '{name}': {paths['baseline']}")
+            return
+
+        if wait:
+            self._report_visual(name, visual_compare.compare_images(
+                paths["baseline"], paths["actual"], paths["diff"], **visual_compare.compare_settings()
+            ))
+        else:
+            self.pending_visuals.append(
+                (name, visual_compare.submit_compare(paths["baseline"], paths["actual"], paths["diff"]))
+            )
+
+    def verify_visuals(self):
+        """
+        Waits for every queued visual comparison and fails if any of them differ.
+        """
+        failures = []
+        pending, self.pending_visuals = self.pending_visuals, []
+        for name, future in pending:
+            try:
+                self._report_visual(name, future.result())
+            except AssertionError as e:
+                failures.append(str(e))
+        assert not failures, "\n".join(failures)
+
+    def _report_visual(self, name: str, result: dict):
+        if result["status"] != "failed":
+            logger.info(f"Visual check '{name}' {result['status']} (diff ratio {result['diff_ratio']:.5f})")
+            return
+
+        for label in ("baseline", "actual", "diff"):
+            if result.get(label) and os.path.exists(result[label]):
+                with open(result[label], "rb") as f:
+                    allure.attach(f.read(), name=f"Visual_{name}_{label}.png",
+                                  attachment_type=allure.attachment_type.PNG)
+        reason = result.get("reason", f"{result['diff_pixels']} pixels differ ({result['diff_ratio']:.3%})")
+        assert False, f"Visual check '{name}' failed: {reason}"
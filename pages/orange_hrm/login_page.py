@@ -1,4 +1,5 @@
 from pages.orange_hrm.base_page import BasePage
+from utils import locator_healing
 from utils.config_reader import get_config
 from utils.logger import get_logger
 
@@ -14,6 +15,7 @@ class LoginPage(BasePage):
         self.login_button_locator = get_config("LOGIN_XPATH", "login_button_xpath", "orange_hrm")
         self.login_status_locator = get_config("LOGIN_XPATH", "login_status_xpath", "orange_hrm")
         self.logout_locator = get_config("LOGIN_XPATH", "logout_xpath", "orange_hrm")
+        locator_healing.register_section("LOGIN_XPATH", "LOGIN_FALLBACKS", "orange_hrm")
 
     def enter_username(self,username):
         self.fill_text(self.username_locator,username)
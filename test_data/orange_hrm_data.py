@@ -1,9 +1,24 @@
+import functools
+
 from utils.config_reader import get_config
 
-URL = get_config("ORANGE_HRM","URL","orange_hrm")
-USERNAME = get_config("ORANGE_HRM","USERNAME","orange_hrm")
-PASSWORD = get_config("ORANGE_HRM","PASSWORD","orange_hrm")
 
-test_001 = {
-    "URL":URL,"USERNAME":USERNAME,"PASSWORD":PASSWORD
-}
\ No newline at end of file
+# Values are resolved on first attribute access (PEP 562), not at import time,
+# so collecting tests that import this module does not read any config.
+@functools.lru_cache(maxsize=None)
+def _load():
+    URL = get_config("ORANGE_HRM","URL","orange_hrm")
+    USERNAME = get_config("ORANGE_HRM","USERNAME","orange_hrm")
+    PASSWORD = get_config("ORANGE_HRM","PASSWORD","orange_hrm")
+
+    test_001 = {
+        "URL":URL,"USERNAME":USERNAME,"PASSWORD":PASSWORD
+    }
+    return {"URL": URL, "USERNAME": USERNAME, "PASSWORD": PASSWORD, "test_001": test_001}
+
+
+def __getattr__(name):
+    try:
+        return _load()[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
\ No newline at end of file
@@ -0,0 +1,31 @@
+# Tables seeded once per session, in insert order (cleanup runs in reverse)
+SEED_TABLES = ["hs_hr_employee"]
+
+# Minimal OrangeHRM-compatible schema, only applied to the sqlite stand-in.
+# Like a real OrangeHRM database it has no tag column; DBClient adds it on first tagged insert.
+SQLITE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS hs_hr_employee (
+        emp_number INTEGER PRIMARY KEY AUTOINCREMENT,
+        employee_id VARCHAR(50),
+        emp_firstname VARCHAR(100),
+        emp_lastname VARCHAR(100),
+        emp_work_email VARCHAR(100)
+    )""",
+    """CREATE TABLE IF NOT EXISTS ohrm_leave_request (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        emp_number INTEGER,
+        leave_type_id INTEGER,
+        date_applied DATE,
+        comments VARCHAR(255)
+    )""",
+]
+
+EMPLOYEES = [
+    {
+        "employee_id": f"E2E{i:04d}",
+        "emp_firstname": "Auto",
+        "emp_lastname": f"Employee{i:04d}",
+        "emp_work_email": f"auto.employee{i:04d}@example.com",
+    }
+    for i in range(1, 101)
+]
@@ -1,7 +1,7 @@
 import allure
 import pytest
 
-from test_data.orange_hrm_data import test_001 as idict
+from test_data import orange_hrm_data
 from utils.decorators import screenshot_on_failure, retry_on_failure, log_start_end
 from utils.ui_client import UIClient
 
@@ -10,11 +10,12 @@ from utils.ui_client import UIClient
 @allure.parent_suite("ORANGE_HRM")
 @pytest.mark.regression
 @pytest.mark.smoke
+@pytest.mark.har("login")
 @screenshot_on_failure
 @retry_on_failure()
 @log_start_end
 def test_verify_login_functionality(orange_hrm_utils,retry_count = None):
-    odict = idict
+    odict = orange_hrm_data.test_001
     page = orange_hrm_utils
     odict["retries_counter"] = retry_count
     step = 1
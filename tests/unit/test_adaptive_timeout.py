@@ -0,0 +1,139 @@
+import json
+import time
+
+import pytest
+
+from utils import adaptive_timeout
+from utils.adaptive_timeout import LatencyStore
+from utils.file_lock import FileLock
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "latency.json")
+
+
+def test_default_until_enough_samples(store_path):
+    store = LatencyStore(store_path)
+    for _ in range(4):
+        store.record("#login", 100)
+    assert store.timeout_for("#login") == 30000
+    assert store.timeout_for("#login", default_ms=5000) == 5000
+
+
+def test_learned_timeout_is_clamped(store_path):
+    store = LatencyStore(store_path)
+    for _ in range(5):
+        store.record("#fast", 100)
+        store.record("#slow", 50000)
+    assert store.timeout_for("#fast") == 2000
+    assert store.timeout_for("#slow") == 60000
+
+    store.record("#mid", 4000)
+    for _ in range(4):
+        store.record("#mid", 1000)
+    # p99 * factor + margin = 4000 * 1.5 + 1000
+    assert store.timeout_for("#mid") == 7000
+
+
+def test_timeout_widens_one_step_after_a_miss(store_path):
+    store = LatencyStore(store_path)
+    for _ in range(10):
+        store.record("#menu", 100)
+    assert store.timeout_for("#menu") == 2000
+
+    store.record_timeout("#menu", 2000)
+    # learned * factor + margin = 2000 * 1.5 + 1000
+    assert store.timeout_for("#menu") == 4000
+
+    # A slower hit inside the widened window is learned and clears the misses
+    store.record("#menu", 3000)
+    assert store.misses == {}
+    assert store.timeout_for("#menu") == 5500
+
+
+def test_always_missing_locator_stays_near_learned_value(store_path):
+    store = LatencyStore(store_path)
+    for _ in range(10):
+        store.record("#gone", 100)
+    seen = []
+    for _ in range(5):
+        # every run misses again, and persists its miss
+        timeout = store.timeout_for("#gone")
+        seen.append(timeout)
+        store.record_timeout("#gone", timeout)
+        store.save()
+        store = LatencyStore(store_path)
+    assert seen == [2000, 4000, 4000, 4000, 4000]
+    assert store.misses == {"#gone": 5}
+    assert store.samples["#gone"] == [100] * 10
+
+
+def test_save_merges_parallel_writers(store_path):
+    first, second = LatencyStore(store_path), LatencyStore(store_path)
+    first.record("#a", 10)
+    second.record("#a", 20)
+    second.record("#b", 30)
+    first.save()
+    second.save()
+
+    with open(store_path) as f:
+        assert json.load(f) == {"latencies": {"#a": [10, 20], "#b": [30]}, "misses": {}}
+    assert LatencyStore(store_path).samples["#a"] == [10, 20]
+
+
+def test_save_merges_misses_and_hits_reset_them(store_path):
+    first, second, third = LatencyStore(store_path), LatencyStore(store_path), LatencyStore(store_path)
+    first.record_timeout("#a", 2000)
+    second.record_timeout("#a", 2000)
+    second.record_timeout("#b", 2000)
+    first.save()
+    second.save()
+    assert LatencyStore(store_path).misses == {"#a": 2, "#b": 1}
+
+    third.record("#a", 50)
+    third.save()
+    assert LatencyStore(store_path).misses == {"#b": 1}
+
+
+def test_reads_latency_table_without_misses(store_path):
+    with open(store_path, "w") as f:
+        json.dump({"#a": [10, 20]}, f)
+    store = LatencyStore(store_path)
+    assert store.samples == {"#a": [10, 20]}
+    assert store.misses == {}
+
+
+def test_save_ignores_lock_file_left_by_killed_run(store_path):
+    with open(f"{store_path}.lock", "w") as f:
+        f.write("12345")
+    store = LatencyStore(store_path)
+    store.record("#a", 10)
+
+    start = time.time()
+    store.save()
+    assert time.time() - start < 5
+    assert LatencyStore(store_path).samples == {"#a": [10]}
+
+
+class _ShortLock(FileLock):
+    def __init__(self, path, timeout=30):
+        super().__init__(path, timeout=0.2)
+
+
+def test_save_keeps_samples_while_lock_is_held(store_path, monkeypatch):
+    monkeypatch.setattr(adaptive_timeout, "FileLock", _ShortLock)
+    store = LatencyStore(store_path)
+    store.record("#a", 10)
+    with FileLock(f"{store_path}.lock"):
+        store.save()
+    assert store.new_samples == {"#a": [10]}
+
+
+def test_file_lock_is_exclusive(tmp_path):
+    path = str(tmp_path / "x.lock")
+    with FileLock(path):
+        with pytest.raises(TimeoutError):
+            FileLock(path, timeout=0.2).acquire()
+    with FileLock(path, timeout=0.2):
+        pass
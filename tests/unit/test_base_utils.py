@@ -0,0 +1,85 @@
+from concurrent.futures import Future
+
+import pytest
+
+from pages.orange_hrm.base_page import BasePage
+from utils.ui_utils.orange_hrm.base_utils import BaseUtils, lazy_page
+from utils.ui_utils.orange_hrm.login_utils import LoginUtils
+
+
+class _FakePage:
+    def __init__(self, page):
+        self.page = page
+
+
+class _PimPage(_FakePage):
+    pass
+
+
+class _LeavePage(_FakePage):
+    pass
+
+
+class PIMUtils(BaseUtils):
+    pim_page_obj = lazy_page(_PimPage)
+
+
+class LeaveUtils(BaseUtils):
+    leave_page_obj = lazy_page(_LeavePage)
+
+
+class Composed(LoginUtils, PIMUtils, LeaveUtils):
+    pass
+
+
+def test_registry_collects_pages_from_every_mixin():
+    assert Composed.page_registry == {
+        "login_page_obj": BaseUtils.page_registry["login_page_obj"],
+        "pim_page_obj": _PimPage,
+        "leave_page_obj": _LeavePage,
+    }
+
+
+def test_registry_of_mixin_is_not_polluted_by_siblings():
+    assert set(PIMUtils.page_registry) == {"login_page_obj", "pim_page_obj"}
+    assert set(LeaveUtils.page_registry) == {"login_page_obj", "leave_page_obj"}
+
+
+def test_pages_are_built_lazily_and_cached():
+    utils = Composed(page="page")
+    assert utils.page_build_times == {}
+
+    pim = utils.pim_page_obj
+    assert isinstance(pim, _PimPage) and pim.page == "page"
+    assert utils.pim_page_obj is pim
+    assert list(utils.page_build_times) == ["pim_page_obj"]
+
+
+class _VisualPage(BasePage):
+    pass
+
+
+class VisualUtils(BaseUtils):
+    visual_page_obj = lazy_page(_VisualPage)
+
+
+def _queued(status):
+    future = Future()
+    future.set_result({"status": status, "diff_ratio": 0.5, "diff_pixels": 10})
+    return future
+
+
+def test_teardown_verification_fails_on_forgotten_visual_diffs():
+    utils = VisualUtils(page="page")
+    utils.verify_pending_visuals()  # nothing built, nothing to check
+
+    utils.visual_page_obj.pending_visuals = [("header", _queued("passed")), ("footer", _queued("failed"))]
+    with pytest.raises(AssertionError, match="Visual check 'footer' failed"):
+        utils.verify_pending_visuals()
+    assert utils.visual_page_obj.pending_visuals == []
+
+
+def test_teardown_verification_passes_matching_visuals():
+    utils = VisualUtils(page="page")
+    utils.visual_page_obj.pending_visuals = [("header", _queued("identical"))]
+    utils.verify_pending_visuals()
@@ -0,0 +1,93 @@
+import os
+import threading
+
+import pytest
+
+from test_data.orange_hrm_db_data import SQLITE_SCHEMA
+from utils.db_client import DBClient, DBConnectionPool, seed_once
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = DBConnectionPool(engine="sqlite", max_size=2, timeout=0.2, sqlite_file=str(tmp_path / "hrm.sqlite"))
+    client = DBClient(pool)
+    for ddl in SQLITE_SCHEMA:
+        client.execute(ddl)
+    yield pool
+    pool.close_all()
+
+
+def _employees(count, prefix="E"):
+    return [{"employee_id": f"{prefix}{i}", "emp_firstname": "First", "emp_lastname": f"Last{i}"} for i in range(count)]
+
+
+def _count(pool, where="1 = 1", params=()):
+    return DBClient(pool).fetch_all(f"SELECT COUNT(*) FROM hs_hr_employee WHERE {where}", params)[0][0]
+
+
+def test_pool_is_bounded_and_times_out(pool):
+    first, second = pool.acquire(), pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+
+    pool.release(first)
+    assert pool.acquire() is first
+    pool.release(first)
+    pool.release(second)
+
+
+def test_pool_hands_released_connection_to_waiter(pool):
+    held = [pool.acquire(), pool.acquire()]
+    threading.Timer(0.05, pool.release, args=(held[0],)).start()
+    assert pool.acquire() is held[0]
+
+
+def test_bulk_insert_batches_and_adds_tag_column(pool):
+    client = DBClient(pool, tag="run1_test")
+    assert "seed_tag" not in client._columns("hs_hr_employee")
+
+    assert client.bulk_insert("hs_hr_employee", _employees(7), batch_size=3) == 7
+    assert "seed_tag" in client._columns("hs_hr_employee")
+    assert _count(pool, "seed_tag = ?", ("run1_test",)) == 7
+
+
+def test_cleanup_only_removes_own_tag(pool):
+    DBClient(pool).bulk_insert("hs_hr_employee", _employees(2, "UNTAGGED"))
+    mine, other = DBClient(pool, tag="mine"), DBClient(pool, tag="other")
+    mine.bulk_insert("hs_hr_employee", _employees(3, "M"))
+    other.bulk_insert("hs_hr_employee", _employees(4, "O"))
+
+    mine.close()
+    assert _count(pool) == 6
+    other.close()
+    assert _count(pool) == 2
+
+
+def test_transactional_client_rolls_back(pool):
+    client = DBClient(pool, transactional=True)
+    client.bulk_insert("hs_hr_employee", _employees(5))
+    assert client.fetch_all("SELECT COUNT(*) FROM hs_hr_employee")[0][0] == 5
+
+    client.close()
+    assert _count(pool) == 0
+
+
+def test_seed_once_runs_seed_a_single_time(tmp_path):
+    calls = []
+    lock_dir = str(tmp_path / "locks")
+
+    assert seed_once(lock_dir, "seed", lambda: calls.append(1)) is True
+    assert seed_once(lock_dir, "seed", lambda: calls.append(1)) is False
+    assert calls == [1]
+    assert not os.path.exists(os.path.join(lock_dir, "seed.lock"))
+
+
+def test_seed_once_does_not_mark_failed_seed_done(tmp_path):
+    lock_dir = str(tmp_path / "locks")
+
+    def failing_seed():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        seed_once(lock_dir, "seed", failing_seed)
+    assert seed_once(lock_dir, "seed", lambda: None) is True
@@ -0,0 +1,107 @@
+import json
+import os
+import time
+import zipfile
+
+import pytest
+
+from utils import har_manager
+from utils.config_reader import get_config
+from utils.har_manager import HAR_ENTRY, HarManager, prune_har
+
+
+def _entry(url, method="GET", status=200, body_file=None, post_file=None, post_text=None, headers=None):
+    request = {"method": method, "url": url, "headers": headers or []}
+    if post_file or post_text is not None:
+        request["postData"] = {"mimeType": "application/json", "text": post_text or "", "_file": post_file}
+    content = {"mimeType": "application/json"}
+    if body_file:
+        content["_file"] = body_file
+    return {"request": request, "response": {"status": status, "content": content}}
+
+
+def _write_har(path, entries, files):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr(HAR_ENTRY, json.dumps({"log": {"entries": entries}}))
+        for name in files:
+            zf.writestr(name, f"body of {name}")
+
+
+def _read_har(path):
+    with zipfile.ZipFile(path) as zf:
+        return json.loads(zf.read(HAR_ENTRY))["log"]["entries"], set(zf.namelist())
+
+
+def test_prune_keeps_attached_post_bodies_apart(tmp_path):
+    path = str(tmp_path / "flow.zip")
+    entries = [
+        _entry("https://hrm/api/login", "POST", body_file="r1.json", post_file="p1.json"),
+        _entry("https://hrm/api/login", "POST", body_file="r2.json", post_file="p2.json"),
+    ]
+    _write_har(path, entries, ["r1.json", "r2.json", "p1.json", "p2.json"])
+
+    assert prune_har(path) == 0
+    kept, names = _read_har(path)
+    assert [e["request"]["postData"]["_file"] for e in kept] == ["p1.json", "p2.json"]
+    assert names == {HAR_ENTRY, "r1.json", "r2.json", "p1.json", "p2.json"}
+
+
+def test_prune_keeps_first_duplicate_and_drops_noise(tmp_path):
+    path = str(tmp_path / "flow.zip")
+    entries = [
+        _entry("https://hrm/web/app.js", body_file="first.js"),
+        _entry("https://hrm/web/app.js", body_file="second.js"),
+        _entry("https://hrm/web/app.js", body_file="other_headers.js", headers=[{"name": "Accept", "value": "x"}]),
+        _entry("https://hrm/api/aborted", status=-1),
+        _entry("https://www.google-analytics.com/collect", body_file="ga.gif"),
+    ]
+    _write_har(path, entries, ["first.js", "second.js", "other_headers.js", "ga.gif"])
+
+    assert prune_har(path) == 3
+    kept, names = _read_har(path)
+    assert [e["response"]["content"]["_file"] for e in kept] == ["first.js", "other_headers.js"]
+    assert names == {HAR_ENTRY, "first.js", "other_headers.js"}
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(har_manager, "get_path", lambda key: str(tmp_path))
+    return HarManager("login", mode="replay")
+
+
+def _write_meta(manager, **meta):
+    with open(manager.path, "w"):
+        pass
+    with open(manager.meta_path, "w") as f:
+        json.dump({"recorded_at": time.time(), "base_url": get_config("ORANGE_HRM", "URL", "orange_hrm"), **meta}, f)
+
+
+def test_stale_reason_without_recording(manager):
+    assert manager.stale_reason() == "no recording"
+
+
+def test_stale_reason_fresh_recording(manager):
+    _write_meta(manager)
+    assert manager.stale_reason() is None
+
+
+def test_stale_reason_old_recording(manager):
+    _write_meta(manager, recorded_at=time.time() - 400 * 86400)
+    assert manager.stale_reason().startswith("recorded 400.0 days ago")
+
+
+def test_stale_reason_other_base_url(manager):
+    _write_meta(manager, base_url="https://elsewhere.example")
+    assert "recorded against https://elsewhere.example" in manager.stale_reason()
+
+
+def test_finalize_moves_worker_recording_over_flow(manager):
+    manager.active_mode = "record"
+    _write_har(manager.record_path, [_entry("https://hrm/web/app.js", body_file="a.js")], ["a.js"])
+
+    manager.finalize()
+    assert not os.path.exists(manager.record_path)
+    assert _read_har(manager.path)[0][0]["request"]["url"] == "https://hrm/web/app.js"
+    with open(manager.meta_path) as f:
+        assert json.load(f)["flow"] == "login"
+    assert manager.stale_reason() is None
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+
+from utils.import_profiler import parse_importtime, summarise
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | io
+import time:      1500 |       1500 |     numpy.core._multiarray_umath
+import time:      2500 |       4000 |   numpy.core
+import time:      1000 |       5000 | numpy
+some unrelated warning line
+import time:       200 |        200 | utils.logger
+"""
+
+
+def test_parse_importtime_reads_times_and_depth():
+    modules = parse_importtime(SAMPLE)
+
+    assert [m["module"] for m in modules] == [
+        "_io", "io", "numpy.core._multiarray_umath", "numpy.core", "numpy", "utils.logger"]
+    assert modules[2] == {"module": "numpy.core._multiarray_umath", "self_ms": 1.5, "cumulative_ms": 1.5, "depth": 2}
+    assert [m["depth"] for m in modules] == [1, 0, 2, 1, 0, 0]
+
+
+def test_parse_importtime_on_real_interpreter_output():
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import json"], capture_output=True, text=True)
+    modules = parse_importtime(proc.stderr)
+
+    assert any(m["module"] == "json" and m["depth"] == 0 for m in modules)
+    assert all(m["cumulative_ms"] >= m["self_ms"] for m in modules)
+
+
+def test_summarise_ranks_top_level_and_packages():
+    report = summarise(parse_importtime(SAMPLE), top=2)
+
+    assert report["module_count"] == 6
+    assert report["total_import_ms"] == 5.62
+    assert [m["module"] for m in report["slowest_top_level"]] == ["numpy", "io"]
+    assert report["slowest_packages"] == [{"package": "numpy", "self_ms": 5.0}, {"package": "io", "self_ms": 0.3}]
@@ -0,0 +1,121 @@
+import json
+import os
+
+import pytest
+
+from utils import locator_healing
+
+PRIMARY = "//button[@type='submit']"
+CHAIN = [
+    f"xpath={PRIMARY}",
+    "testid=login-button",
+    'role=button[name="Login"]',
+    "css=form button.orangehrm-login-button",
+]
+
+
+@pytest.fixture(autouse=True)
+def healing(tmp_path, monkeypatch):
+    index_file = str(tmp_path / "locator_index.json")
+    monkeypatch.setattr(locator_healing, "_index_path", lambda: index_file)
+    monkeypatch.setattr(locator_healing, "_chains", {})
+    monkeypatch.setattr(locator_healing, "_index", None)
+    monkeypatch.setattr(locator_healing, "_index_updates", {})
+    monkeypatch.setattr(locator_healing, "_resolved", {})
+    monkeypatch.setattr(locator_healing, "fallback_uses", [])
+    locator_healing.register_section("LOGIN_XPATH", "LOGIN_FALLBACKS", "orange_hrm")
+    return index_file
+
+
+def _reload_process():
+    # What a later run (or another xdist worker) starts from
+    locator_healing._index = None
+    locator_healing._index_updates.clear()
+    locator_healing.fallback_uses.clear()
+
+
+def test_register_section_builds_chains_for_keys_with_fallbacks():
+    assert locator_healing._chains[PRIMARY] == {"name": "LOGIN_XPATH.login_button_xpath", "chain": CHAIN}
+    assert sorted(c["name"] for c in locator_healing._chains.values()) == [
+        f"LOGIN_XPATH.{key}" for key in
+        ("login_button_xpath", "login_status_xpath", "logout_xpath", "password_xpath", "username_xpath")]
+    # Sections without a fallback section register nothing
+    locator_healing.register_section("LOGIN_XPATH", "NO_SUCH_FALLBACKS", "orange_hrm")
+    assert len(locator_healing._chains) == 5
+    assert locator_healing.chain_for("//not/registered") == []
+    assert locator_healing.chain_for(object()) == []
+
+
+@pytest.mark.parametrize("entry, expected", [
+    ("//input[@name='a']", "xpath=//input[@name='a']"),
+    ("(//a)[1]", "xpath=(//a)[1]"),
+    ("input.name", "css=input.name"),
+    ("  text=Login ", "text=Login"),
+    ("role=button", "role=button"),
+])
+def test_normalise(entry, expected):
+    assert locator_healing._normalise(entry) == expected
+
+
+def test_probe_specs():
+    specs = locator_healing.probe_specs(CHAIN + ["role=menuitem"])
+    assert specs[0] == {"kind": "xpath", "value": PRIMARY}
+    assert specs[1] == {"kind": "testid", "value": "login-button"}
+    assert specs[2] == {"kind": "role", "value": 'button[name="Login"]', "role": "button", "name": "Login"}
+    assert specs[4]["role"] == "menuitem" and specs[4]["name"] is None
+
+
+def test_playwright_selector():
+    assert locator_healing.playwright_selector("testid=x") == \
+        'css=[data-testid="x"], [data-test="x"], [data-test-id="x"]'
+    assert locator_healing.playwright_selector("text=Login") == 'text="Login"'
+    assert locator_healing.playwright_selector("css=a.b") == "css=a.b"
+
+
+def test_primary_stays_first_after_a_fallback_resolved(healing):
+    locator_healing.remember(PRIMARY, CHAIN[2])
+    assert locator_healing.resolved(PRIMARY) == CHAIN[2]
+    assert locator_healing.fallback_uses == [
+        {"element": "LOGIN_XPATH.login_button_xpath", "primary": CHAIN[0], "resolved_by": CHAIN[2]}]
+    locator_healing.save_index()
+    _reload_process()
+
+    assert locator_healing.chain_for(PRIMARY) == [CHAIN[0], CHAIN[2], CHAIN[1], CHAIN[3]]
+
+
+def test_primary_resolving_clears_index_and_is_not_reported(healing):
+    locator_healing.remember(PRIMARY, CHAIN[1])
+    locator_healing.save_index()
+    _reload_process()
+
+    locator_healing.remember(PRIMARY, CHAIN[0])
+    assert locator_healing.fallback_uses == []
+    assert locator_healing.resolved(PRIMARY) == CHAIN[0]
+    locator_healing.save_index()
+    with open(healing) as f:
+        assert json.load(f) == {}
+    assert locator_healing.chain_for(PRIMARY) == CHAIN
+
+
+def test_save_index_merges_parallel_workers(healing):
+    with open(healing, "w") as f:
+        json.dump({"LOGIN_XPATH.password_xpath": "testid=password"}, f)
+
+    # This worker loaded the index before another one saved a new entry
+    locator_healing.remember(PRIMARY, CHAIN[1])
+    with open(healing, "w") as f:
+        json.dump({"LOGIN_XPATH.password_xpath": "testid=password",
+                   "LOGIN_XPATH.username_xpath": "testid=username"}, f)
+    locator_healing.save_index()
+
+    with open(healing) as f:
+        assert json.load(f) == {
+            "LOGIN_XPATH.password_xpath": "testid=password",
+            "LOGIN_XPATH.username_xpath": "testid=username",
+            "LOGIN_XPATH.login_button_xpath": CHAIN[1],
+        }
+
+
+def test_save_index_without_changes_writes_nothing(healing):
+    locator_healing.save_index()
+    assert not os.path.exists(healing)
@@ -0,0 +1,129 @@
+import os
+import subprocess
+import sys
+
+from utils.config_reader import ROOT_DIR
+
+# Runs the real playwright_ui fixture against a fake Playwright whose setup or
+# teardown steps fail, and checks nothing is leaked afterwards.
+INNER_TESTS = '''
+import threading
+
+import pytest
+
+from utils import resource_governor
+
+resource_governor.wait_for_headroom = lambda: 0.0
+released = []
+_release = resource_governor.BrowserSlot.release
+
+
+def _tracking_release(self):
+    if self.fd is not None:
+        released.append(self.index)
+    _release(self)
+
+
+resource_governor.BrowserSlot.release = _tracking_release
+FAIL = {"step": None}
+closed = []
+
+
+class FakeTracing:
+    def start(self, **kwargs):
+        pass
+
+    def stop(self, path=None):
+        if FAIL["step"] == "tracing.stop":
+            raise RuntimeError("browser crashed")
+
+
+class FakeContext:
+    def __init__(self):
+        self.tracing = FakeTracing()
+
+    def new_page(self):
+        return FakePage(self)
+
+    def close(self):
+        closed.append("context")
+
+
+class FakePage:
+    video = None
+
+    def __init__(self, context):
+        self.context = context
+
+    def close(self):
+        closed.append("page")
+
+
+class FakeBrowser:
+    def new_context(self, **kwargs):
+        if FAIL["step"] == "new_context":
+            raise RuntimeError("context failed")
+        return FakeContext()
+
+    def close(self):
+        closed.append("browser")
+
+
+class FakeChromium:
+    def launch(self, **kwargs):
+        return FakeBrowser()
+
+
+class FakePlaywright:
+    chromium = FakeChromium()
+
+
+@pytest.fixture(scope="session")
+def playwright_context():
+    return FakePlaywright()
+
+
+def _assert_nothing_leaked():
+    assert closed.count("browser") == 1
+    assert len(released) == 1
+    assert not [t for t in threading.enumerate() if isinstance(t, resource_governor.ResourceSampler) and t.is_alive()]
+    closed.clear()
+    released.clear()
+
+
+def test_a_setup_fails(playwright_ui):
+    pass
+
+
+def test_b_setup_failure_released_everything():
+    _assert_nothing_leaked()
+    FAIL["step"] = "tracing.stop"
+
+
+def test_c_teardown_fails(playwright_ui):
+    pass
+
+
+def test_d_teardown_failure_released_everything():
+    assert closed[:3] == ["page", "context", "browser"]
+    _assert_nothing_leaked()
+
+
+FAIL["step"] = "new_context"
+'''
+
+
+def test_playwright_ui_releases_resources_when_steps_fail(tmp_path):
+    test_file = tmp_path / "test_inner_playwright_ui.py"
+    test_file.write_text(INNER_TESTS)
+    env = dict(os.environ, E2E_HAR_MODE="off")
+    env.pop("PYTEST_XDIST_WORKER", None)
+
+    proc = subprocess.run(
+        [sys.executable, "-m", "pytest", "-p", "conftest", "-q", "-o", "addopts=", "-p", "no:cacheprovider",
+         "-p", "no:randomly", str(test_file)],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True,
+    )
+    output = proc.stdout + proc.stderr
+    assert "3 passed, 2 errors" in output, output
+    assert "context failed" in output and "browser crashed" in output
@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from utils import run_history
+from utils.config_reader import ROOT_DIR
+from utils.run_history import OUTCOMES, RECORD_DTYPE
+
+
+@pytest.fixture
+def history_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("E2E_HISTORY_DIR", str(tmp_path))
+    monkeypatch.setattr(run_history, "_known_ids", None)
+    return tmp_path
+
+
+def _records(rows):
+    """
+    rows: (run, test_id, timestamp, duration, outcome, retries)
+    """
+    return np.array([(r, t, ts, d, OUTCOMES[o], rt) for r, t, ts, d, o, rt in rows], dtype=RECORD_DTYPE)
+
+
+def test_append_and_load_round_trip(history_dir):
+    run_history.append_result("a1", "tests/test_x.py::test_one", "passed", 1.5, retries=0, timestamp=10.0)
+    run_history.append_result("ci-build-42", "tests/test_x.py::test_one", "failed", 2.5, retries=1, timestamp=20.0)
+    run_history.append_result("ci-build-42", "tests/test_x.py::test_two", "skipped", 0.0, retries=0, timestamp=21.0)
+
+    records = run_history.load_records()
+    assert records.size == 3
+    run_ids = [run_history.hash_nodeid("a1")] + [run_history.hash_nodeid("ci-build-42")] * 2
+    assert list(records["run_id"]) == run_ids
+    assert list(records["outcome"]) == [OUTCOMES["passed"], OUTCOMES["failed"], OUTCOMES["skipped"]]
+    assert run_history.load_records(last_runs=1).size == 2
+    assert set(run_history.load_names().values()) == {"tests/test_x.py::test_one", "tests/test_x.py::test_two"}
+
+
+def test_load_records_ignores_partial_trailing_record(history_dir):
+    run_history.append_result("a1", "t", "passed", 1.0, retries=0, timestamp=1.0)
+    with open(history_dir / "results.bin", "ab") as f:
+        f.write(b"\x00" * 5)
+    assert run_history.load_records().size == 1
+
+
+def test_time_hogs_ranks_by_total_time():
+    records = _records([(1, 7, 0, 1.0, "passed", 0), (2, 7, 1, 1.0, "passed", 0), (1, 8, 0, 5.0, "passed", 0)])
+    hogs = run_history.time_hogs(records)
+    assert [(h["test_id"], h["total_s"], h["runs"]) for h in hogs] == [(8, 5.0, 1), (7, 2.0, 2)]
+    assert hogs[0]["share"] == round(5 / 7, 4)
+
+
+def test_flaky_tests_counts_flips_and_retried_passes():
+    outcomes = ["passed", "failed", "passed", "passed", "passed"]
+    rows = [(run, 1, run, 1.0, o, 0) for run, o in enumerate(outcomes)]
+    rows += [(run, 2, run, 1.0, "passed", 1 if run == 0 else 0) for run in range(5)]
+    rows += [(run, 3, run, 1.0, "failed", 0) for run in range(5)]  # always failing, not flaky
+    rows += [(run, 4, run, 1.0, "passed", 0) for run in range(5)]  # stable
+
+    flaky = run_history.flaky_tests(_records(rows), min_runs=5)
+    assert [(f["test_id"], f["score"]) for f in flaky] == [(1, 0.4), (2, 0.2)]
+    assert flaky[0]["fail_rate"] == 0.2
+
+
+def test_slowdowns_compare_recent_p95_with_older_runs():
+    rows = [(run, 1, run, 1.0 if run < 5 else 3.0, "passed", 0) for run in range(10)]
+    rows += [(run, 2, run, 1.0, "passed", 0) for run in range(10)]
+
+    slow = run_history.slowdowns(_records(rows), recent_runs=5, ratio=1.5)
+    assert slow == [{"test_id": 1, "slowdown": 3.0, "baseline_p95_s": 1.0, "recent_p95_s": 3.0}]
+
+
+def _run_generated_tests(history_dir, tmp_path, *args, **env_overrides):
+    test_file = tmp_path / "test_generated.py"
+    test_file.write_text("import pytest\n\n\n@pytest.mark.parametrize('n', range(4))\ndef test_n(n):\n    pass\n")
+    env = {k: v for k, v in os.environ.items() if k not in ("PYTEST_XDIST_WORKER", "E2E_RUN_HISTORY")}
+    env.update(E2E_RUN_ID="ci-build-42", E2E_HISTORY_DIR=str(history_dir), **env_overrides)
+
+    proc = subprocess.run(
+        [sys.executable, "-m", "pytest", "-p", "conftest", "-q", "-o", "addopts=", "-p", "no:cacheprovider",
+         *args, str(test_file)],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True,
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+
+
+def test_recording_is_off_by_default(history_dir, tmp_path):
+    _run_generated_tests(history_dir, tmp_path)
+    assert run_history.load_records().size == 0
+
+
+def test_xdist_run_records_each_test_once(history_dir, tmp_path):
+    pytest.importorskip("xdist")
+    _run_generated_tests(history_dir, tmp_path, "-n", "2", E2E_RUN_HISTORY="true")
+
+    records = run_history.load_records()
+    assert records.size == 4
+    assert np.unique(records["test_id"]).size == 4
+    assert set(records["retries"]) == {0}
@@ -0,0 +1,126 @@
+import pytest
+
+from utils.tab_manager import TabManager
+
+
+class FakePage:
+    def __init__(self, context, fail_close=False):
+        self.context = context
+        self.url = "about:blank"
+        self.closed = False
+        self.fail_close = fail_close
+        self.loads = []
+
+    def goto(self, url, wait_until="load", timeout=None):
+        self.url = url
+        self.loads.append(wait_until)
+
+    def wait_for_load_state(self, state="load", timeout=None):
+        self.loads.append(state)
+
+    def bring_to_front(self):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        if self.fail_close:
+            raise RuntimeError("target crashed")
+        self.closed = True
+        self.context.pages.remove(self)
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+
+    def new_page(self, fail_close=False):
+        page = FakePage(self, fail_close)
+        self.pages.append(page)
+        return page
+
+
+class PageObject:
+    def __init__(self, page):
+        self.page = page
+
+
+@pytest.fixture
+def context():
+    return FakeContext()
+
+
+@pytest.fixture
+def manager(context):
+    return TabManager(context, main_page=context.new_page())
+
+
+def test_open_navigates_and_tracks(manager, context):
+    page = manager.open("admin", "https://hrm/admin")
+    assert manager.tabs == {"admin": page}
+    assert page.url == "https://hrm/admin" and page.loads == ["load"]
+    assert len(context.pages) == 2
+
+
+def test_duplicate_name_is_rejected_before_a_page_is_created(manager, context):
+    manager.open("admin", "https://hrm/admin")
+    with pytest.raises(ValueError, match="Tab 'admin' is already open"):
+        manager.open("admin", "https://hrm/other")
+    with pytest.raises(ValueError):
+        manager.open_many({"pim": "https://hrm/pim", "admin": "https://hrm/other"})
+    assert len(context.pages) == 2
+    assert manager.orphans() == []
+
+
+def test_name_of_a_closed_tab_can_be_reused(manager):
+    first = manager.open("admin")
+    first.close()
+    assert manager.open("admin") is not first
+
+
+def test_open_many_commits_every_navigation_before_waiting(manager):
+    tabs = manager.open_many({"pim": "https://hrm/pim", "leave": "https://hrm/leave"}, page_cls=PageObject)
+    assert [t.page.url for t in tabs.values()] == ["https://hrm/pim", "https://hrm/leave"]
+    assert all(t.page.loads == ["commit", "load"] for t in tabs.values())
+
+
+def test_get_caches_page_objects_per_tab(manager):
+    manager.open("a")
+    manager.open("b")
+    first = manager.get("a", PageObject)
+    assert manager.get("a", PageObject) is first
+    assert manager.get("b", PageObject) is not first
+    assert manager.get("b", PageObject).page is manager.tabs["b"]
+    assert manager.get("a") is manager.tabs["a"]
+
+
+def test_adopt_tracks_page_opened_elsewhere(manager, context):
+    popup = context.new_page()
+    assert manager.orphans() == [popup]
+    assert manager.adopt("popup", popup, PageObject).page is popup
+    assert manager.orphans() == []
+
+
+def test_close_orphans_forgets_closed_tabs_and_spares_main_page(manager, context):
+    tab = manager.open("admin")
+    manager.get("admin", PageObject)
+    tab.close()  # the app closed it itself
+    popup = context.new_page()
+
+    assert manager.close_orphans() == 1
+    assert popup.closed
+    assert manager.tabs == {} and manager._page_objects == {}
+    assert context.pages == [manager.main_page]
+
+
+def test_close_all_keeps_going_when_a_close_fails(manager, context):
+    broken = context.new_page(fail_close=True)
+    manager.adopt("broken", broken)
+    healthy = manager.open("healthy")
+    orphan = context.new_page()
+
+    manager.close_all()
+    assert healthy.closed and orphan.closed
+    assert manager.tabs == {}
+    assert not manager.main_page.closed
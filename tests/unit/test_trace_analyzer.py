@@ -0,0 +1,85 @@
+import json
+import zipfile
+
+import pytest
+
+from utils.trace_analyzer import analyze_trace, summarise
+
+
+def _jsonl(events):
+    return "\n".join(json.dumps(e) for e in events) + "\n"
+
+
+def _resource(url, monotonic_ms, duration_ms, status=200, size=100, method="GET"):
+    return {"type": "resource-snapshot", "snapshot": {
+        "_monotonicTime": monotonic_ms, "time": duration_ms,
+        "request": {"url": url, "method": method},
+        "response": {"status": status, "_transferSize": size, "content": {"size": size, "mimeType": "text/html"}},
+    }}
+
+
+@pytest.fixture
+def trace_zip(tmp_path):
+    # Timestamps as Playwright writes them: monotonic milliseconds for actions and resources
+    trace = [
+        {"type": "context-options", "browserName": "chromium"},
+        {"type": "before", "callId": "call@1", "apiName": "page.goto", "startTime": 1000.0,
+         "params": {"url": "https://hrm/login"}},
+        {"type": "after", "callId": "call@1", "endTime": 1800.0},
+        {"type": "before", "callId": "call@2", "apiName": "locator.click", "startTime": 2000.0,
+         "params": {"selector": "button[type=submit]"}},
+        {"type": "after", "callId": "call@2", "endTime": 2050.0},
+        {"type": "before", "callId": "call@3", "apiName": "locator.fill", "startTime": 2100.0,
+         "params": {"selector": "#missing"}},
+        {"type": "after", "callId": "call@3", "endTime": 2400.0, "error": {"message": "Timeout 300ms exceeded"}},
+        {"type": "console", "messageType": "error", "text": "Uncaught TypeError"},
+        {"type": "console", "messageType": "log", "text": "ignored"},
+    ]
+    network = [
+        _resource("https://hrm/login", 1010.0, 400.0, size=5000),
+        _resource("https://hrm/app.js", 1450.5, 120.0, size=90000),
+        _resource("https://hrm/api/missing", 2060.0, 15.0, status=404, size=10),
+        _resource("https://tracker.example/refused", 2070.0, 0.0, status=-1, size=0),
+    ]
+    path = tmp_path / "test_login.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("trace.trace", _jsonl(trace) + "not json\n")
+        zf.writestr("trace.network", _jsonl(network))
+        zf.writestr("resources/abc.png", b"")
+    return str(path)
+
+
+def test_analyze_trace_actions_and_requests(trace_zip):
+    result = analyze_trace(trace_zip, top=2)
+
+    assert result["trace"] == "test_login.zip"
+    assert result["actions"] == 3
+    assert result["total_action_ms"] == 1150.0
+    assert [a["action"] for a in result["slowest_actions"]] == ["page.goto", "locator.fill"]
+    assert result["failed_actions"][0]["target"] == "#missing"
+    assert result["requests"] == 4
+    assert result["transfer_bytes"] == 95010
+    assert result["largest_resources"][0]["url"] == "https://hrm/app.js"
+    assert [r["status"] for r in result["failed_requests"]] == [404, -1]
+    assert result["console_errors"] == ["Uncaught TypeError"]
+
+
+def test_requests_and_actions_share_one_timeline(trace_zip):
+    result = analyze_trace(trace_zip)
+
+    # _monotonicTime is already in ms: offsets are relative to the first action (1000 ms)
+    assert [r["start_ms"] for r in result["waterfall"]] == [10.0, 450.5, 1060.0, 1070.0]
+    assert result["slowest_actions"][0]["start_ms"] == 0.0
+
+
+def test_summarise_across_traces(trace_zip):
+    first = analyze_trace(trace_zip)
+    second = dict(first, trace="other.zip", total_action_ms=5.0, console_errors=[])
+
+    summary = summarise([first, second], top=1)
+    assert summary["traces"] == 2
+    assert summary["slowest_tests"] == [{"trace": "test_login.zip", "total_action_ms": 1150.0, "requests": 4,
+                                         "transfer_bytes": 95010, "console_errors": 1}]
+    assert summary["slowest_actions"][0]["action"] == "page.goto"
+    assert summary["largest_resources"][0]["bytes"] == 90000
+    assert summary["console_errors"] == [{"trace": "test_login.zip", "errors": ["Uncaught TypeError"]}]
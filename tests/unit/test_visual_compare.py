@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from utils import visual_compare
+
+
+def _page(path, text="Welcome Admin", button=(255, 123, 29), size=(1280, 800)):
+    img = Image.new("RGB", size, (245, 245, 245))
+    draw = ImageDraw.Draw(img)
+    draw.text((40, 30), text, fill=(40, 40, 40), font=ImageFont.load_default(size=32))
+    draw.rectangle((40, 120, 160, 160), fill=button)
+    img.save(path)
+    return str(path)
+
+
+def _compare(tmp_path, baseline, actual, **settings):
+    return visual_compare.compare_images(baseline, actual, str(tmp_path / "diff.png"), **settings)
+
+
+def test_identical_pixels_with_different_encoding(tmp_path):
+    baseline = _page(tmp_path / "baseline.png")
+    Image.open(baseline).save(tmp_path / "actual.png", compress_level=0)
+
+    assert _compare(tmp_path, baseline, str(tmp_path / "actual.png"))["status"] == "identical"
+
+
+@pytest.mark.parametrize("change", [{"text": "Welcome Adm1n"}, {"button": (255, 150, 29)}])
+def test_small_text_and_colour_changes_fail(tmp_path, change):
+    baseline = _page(tmp_path / "baseline.png")
+    actual = _page(tmp_path / "actual.png", **change)
+
+    result = _compare(tmp_path, baseline, actual, channel_tolerance=16, max_diff_ratio=0.0001)
+    assert result["status"] == "failed"
+    assert result["diff_pixels"] > 0
+    assert (tmp_path / "diff.png").exists()
+
+
+def test_phash_skip_is_opt_in(tmp_path):
+    baseline = _page(tmp_path / "baseline.png")
+    actual = _page(tmp_path / "actual.png", text="Welcome Adm1n")
+
+    assert _compare(tmp_path, baseline, actual, max_diff_ratio=0.0001)["hash_distance"] is None
+    skipped = _compare(tmp_path, baseline, actual, max_diff_ratio=0.0001, phash_skip_distance=256)
+    assert skipped["status"] == "phash_match"
+
+
+@pytest.mark.parametrize("shape", [(10, 1, 3), (1, 1, 3), (1, 5, 3)])
+def test_narrow_images_do_not_break_the_hash(tmp_path, shape):
+    base = np.zeros(shape, dtype=np.int16)
+    actual = base.copy()
+    actual[0, 0] = (255, 255, 255)
+    visual_compare._save_rgb(base, str(tmp_path / "baseline.png"))
+    visual_compare._save_rgb(actual, str(tmp_path / "actual.png"))
+
+    paths = str(tmp_path / "baseline.png"), str(tmp_path / "actual.png")
+    hashed = _compare(tmp_path, *paths, phash_skip_distance=0)
+    assert hashed["hash_distance"] is None or hashed["hash_distance"] >= 0
+    assert not np.isnan(hashed["diff_ratio"])
+    assert _compare(tmp_path, *paths)["status"] == "failed"
+
+
+def test_perceptual_hash_of_narrow_image_is_none():
+    assert visual_compare.perceptual_hash(np.zeros((10, 1, 3))) is None
+    assert visual_compare.perceptual_hash(np.zeros((10, 2, 3))).size == 1
+
+
+def test_pool_size_is_shared_between_xdist_workers(monkeypatch):
+    created = {}
+    monkeypatch.setattr(visual_compare, "_pool", None)
+    monkeypatch.setattr(visual_compare, "ProcessPoolExecutor", lambda max_workers: created.setdefault("n", max_workers))
+    monkeypatch.setattr(visual_compare, "get_config_value", lambda section, key: "0")
+    monkeypatch.setattr(visual_compare.os, "cpu_count", lambda: 8)
+    monkeypatch.setenv("PYTEST_XDIST_WORKER_COUNT", "4")
+
+    visual_compare.get_pool()
+    assert created["n"] == 2
+
+
+def test_captures_are_unique_per_test_and_check(tmp_path, monkeypatch):
+    monkeypatch.setattr(visual_compare, "get_path", lambda key: str(tmp_path / key))
+    monkeypatch.setenv("PYTEST_CURRENT_TEST", "tests/test_a.py::test_x[1] (call)")
+    first, second = visual_compare.visual_paths("login page"), visual_compare.visual_paths("login page")
+    monkeypatch.setenv("PYTEST_CURRENT_TEST", "tests/test_a.py::test_x[2] (call)")
+    other_case = visual_compare.visual_paths("login page")
+
+    assert first["baseline"] == second["baseline"] == other_case["baseline"]
+    assert first["baseline"].endswith("login_page.png")
+    assert len({p["actual"] for p in (first, second, other_case)}) == 3
+    assert len({p["diff"] for p in (first, second, other_case)}) == 3
@@ -0,0 +1,187 @@
+"""
+Adaptive element timeouts learned from how long each locator took to appear.
+
+timeout = clamp(percentile(latencies) * factor + margin, min_ms, max_ms)
+once a locator has min_samples recorded latencies, otherwise default_ms.
+
+Timed-out waits are kept apart from the latencies as a count of misses since the
+locator last appeared. While that count is non-zero the timeout is widened by
+exactly one step (learned * factor + margin), so a learned value that was too
+tight can recover on the next hit, but an element that is really missing still
+fails fast instead of pushing its own timeout up run after run.
+
+Usage (review the learned table):
+    python -m utils.adaptive_timeout [--json path]
+"""
+import argparse
+import json
+import math
+import os
+
+from utils.config_reader import get_config_value, get_path
+from utils.file_lock import FileLock
+from utils.logger import get_logger
+
+logger = get_logger()
+
+_store = None
+
+
+def _setting(key: str) -> float:
+    return float(get_config_value("ADAPTIVE_TIMEOUT", key))
+
+
+def _percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class LatencyStore:
+    """
+    Per-locator appearance latencies (ms) and consecutive-miss counts, persisted in
+    a JSON file shared by all runs. Only the newest max_samples per locator are kept.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(get_path("adaptive_dir"), "latency.json")
+        self.max_samples = int(_setting("max_samples"))
+        self.samples, self.misses = self._read()
+        self.new_samples = {}
+        # key -> (hit seen in this process, misses after the last hit)
+        self.new_misses = {}
+
+    def _read(self) -> tuple:
+        if not os.path.exists(self.path):
+            return {}, {}
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable latency table {self.path}: {e}")
+            return {}, {}
+        if "latencies" not in data:
+            # Tables written before misses were tracked only hold latencies
+            return data, {}
+        return data["latencies"], data.get("misses", {})
+
+    def record(self, key: str, latency_ms: float):
+        self.new_samples.setdefault(key, []).append(round(latency_ms, 1))
+        history = self.samples.setdefault(key, [])
+        history.append(round(latency_ms, 1))
+        del history[:-self.max_samples]
+        self.misses.pop(key, None)
+        self.new_misses[key] = (True, 0)
+
+    def record_timeout(self, key: str, timeout_ms: float):
+        """
+        The element did not appear within timeout_ms. Counted as a miss, never as a latency.
+        """
+        self.misses[key] = self.misses.get(key, 0) + 1
+        reset, count = self.new_misses.get(key, (False, 0))
+        self.new_misses[key] = (reset, count + 1)
+        logger.info(f"Adaptive timeout missed for '{key}' at {timeout_ms:.0f} ms ({self.misses[key]} in a row)")
+
+    def timeout_for(self, key: str, default_ms: float = None) -> float:
+        history = self.samples.get(key, [])
+        if len(history) < _setting("min_samples"):
+            return default_ms if default_ms is not None else _setting("default_ms")
+        learned = _percentile(history, _setting("percentile")) * _setting("factor") + _setting("margin_ms")
+        learned = max(learned, _setting("min_ms"))
+        if self.misses.get(key):
+            # One step only, however many misses: a missing element must keep failing fast
+            learned = learned * _setting("factor") + _setting("margin_ms")
+        return min(learned, _setting("max_ms"))
+
+    def save(self):
+        """
+        Merges this process's new samples and misses into the file under a file lock,
+        so parallel xdist workers do not overwrite each other.
+        """
+        if not self.new_samples and not self.new_misses:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        lock = FileLock(f"{self.path}.lock", timeout=30)
+        try:
+            lock.acquire()
+        except TimeoutError as e:
+            logger.warning(f"Latency table is locked, samples not saved: {e}")
+            return
+
+        try:
+            merged, misses = self._read()
+            for key, values in self.new_samples.items():
+                history = merged.setdefault(key, [])
+                history.extend(values)
+                del history[:-self.max_samples]
+            for key, (reset, count) in self.new_misses.items():
+                total = count + (0 if reset else misses.get(key, 0))
+                if total:
+                    misses[key] = total
+                else:
+                    misses.pop(key, None)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"latencies": merged, "misses": misses}, f)
+            os.replace(tmp_path, self.path)
+            self.samples, self.misses = merged, misses
+            self.new_samples = {}
+            self.new_misses = {}
+        finally:
+            lock.release()
+
+    def table(self) -> list:
+        rows = []
+        for key, history in sorted(self.samples.items()):
+            rows.append({
+                "locator": key,
+                "samples": len(history),
+                "p50_ms": _percentile(history, 0.5),
+                "p95_ms": _percentile(history, 0.95),
+                "max_ms": max(history),
+                "misses": self.misses.get(key, 0),
+                "timeout_ms": round(self.timeout_for(key)),
+            })
+        return rows
+
+
+def get_store() -> LatencyStore:
+    global _store
+    if _store is None:
+        _store = LatencyStore()
+    return _store
+
+
+def timeout_for(key: str, explicit_ms: float = None) -> float:
+    """
+    Explicit timeouts passed by callers win; otherwise the learned (or default) value.
+    """
+    if explicit_ms is not None:
+        return explicit_ms
+    return get_store().timeout_for(key)
+
+
+def record(key: str, latency_ms: float):
+    get_store().record(key, latency_ms)
+
+
+def record_timeout(key: str, timeout_ms: float):
+    get_store().record_timeout(key, timeout_ms)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the learned per-locator timeout table.")
+    parser.add_argument("--json", default=None, help="also write the table to this JSON file")
+    args = parser.parse_args(argv)
+
+    rows = get_store().table()
+    print(f"{'samples':>8} {'p50':>8} {'p95':>8} {'max':>8} {'misses':>8} {'timeout':>8}  locator")
+    for row in rows:
+        print(f"{row['samples']:>8} {row['p50_ms']:>8.0f} {row['p95_ms']:>8.0f} "
+              f"{row['max_ms']:>8.0f} {row['misses']:>8} {row['timeout_ms']:>8}  {row['locator']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,15 @@
 import configparser
+import functools
 import os
 import pathlib as pl
 Path = pl.Path
 path = Path(__file__)
 ROOT_DIR = path.parent.parent.absolute()
 
+@functools.lru_cache(maxsize=None)
 def config_reader(module: str = ""):
     """
+    Parsed once per process and cached, callers must treat the result as read-only.
     :return: config reader object for config.ini
     """
     if module != "":
@@ -0,0 +1,273 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.config_reader import get_config_value, get_path
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+class DBConnectionPool:
+    """
+    Bounded pool of DB-API connections.
+    Works with PyMySQL for a real OrangeHRM database or with sqlite3 as a local stand-in.
+    """
+
+    def __init__(self, engine: str = None, max_size: int = None, timeout: float = None, sqlite_file: str = None):
+        self.engine = (engine or get_config_value("DATABASE", "engine")).lower()
+        self.max_size = max_size or int(get_config_value("DATABASE", "pool_size"))
+        self.timeout = timeout or int(get_config_value("DATABASE", "pool_timeout"))
+        self.sqlite_file = sqlite_file
+        self._idle = queue.LifoQueue(maxsize=self.max_size)
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @property
+    def placeholder(self) -> str:
+        return "?" if self.engine == "sqlite" else "%s"
+
+    def _connect(self):
+        if self.engine == "sqlite":
+            db_file = self.sqlite_file or os.path.join(get_path("db_dir"), get_config_value("DATABASE", "sqlite_file"))
+            os.makedirs(os.path.dirname(db_file), exist_ok=True)
+            # xdist workers share the same file, so wait on locks instead of failing
+            return sqlite3.connect(db_file, timeout=self.timeout, check_same_thread=False)
+
+        # Imported lazily so sqlite-only runs do not need PyMySQL
+        import pymysql
+        return pymysql.connect(
+            host=get_config_value("DATABASE", "host"),
+            port=int(get_config_value("DATABASE", "port")),
+            user=get_config_value("DATABASE", "user"),
+            password=get_config_value("DATABASE", "password"),
+            database=get_config_value("DATABASE", "database"),
+            autocommit=False,
+        )
+
+    def acquire(self):
+        """
+        Returns an idle connection, opens a new one while below max_size,
+        otherwise blocks until another caller releases one.
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.max_size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No DB connection available within {self.timeout}s (pool size {self.max_size}).")
+
+    def release(self, conn):
+        self._idle.put_nowait(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.close()
+            except Exception as e:
+                logger.warning(f"Could not close DB connection: {e}")
+        with self._lock:
+            self._created = 0
+
+
+class DBClient:
+    """
+    Seeding helper on top of DBConnectionPool.
+
+    transactional=True : holds one connection and rolls everything back on close().
+                         Use it for DB-only checks, the UI will not see uncommitted rows.
+    transactional=False: commits each batch and tags rows with `tag`, close() deletes
+                         every tagged row so the UI can see the data during the test.
+
+    Tagged inserts need a nullable tag column (tag_column in [DATABASE]) on the table.
+    A stock OrangeHRM schema does not have one, so ensure_tag_column() adds it
+    (ALTER TABLE ... ADD COLUMN seed_tag VARCHAR(64) plus an index) the first time
+    a table is seeded with a tag. Point [DATABASE] at a disposable test database.
+    """
+
+    def __init__(self, pool: DBConnectionPool, tag: str = None, transactional: bool = False):
+        self.pool = pool
+        self.tag = tag
+        self.transactional = transactional
+        self.tag_column = get_config_value("DATABASE", "tag_column")
+        self.batch_size = int(get_config_value("DATABASE", "batch_size"))
+        self._conn = pool.acquire() if transactional else None
+        self._tagged_tables = []
+        self._tag_column_checked = set()
+
+    @contextmanager
+    def _cursor(self):
+        if self._conn is not None:
+            cursor = self._conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+            return
+
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def _sql(self, query: str) -> str:
+        # Queries are written with %s placeholders, sqlite expects ?
+        return query.replace("%s", self.pool.placeholder)
+
+    def execute(self, query: str, params=()):
+        with self._cursor() as cursor:
+            cursor.execute(self._sql(query), params)
+            return cursor.rowcount
+
+    def fetch_all(self, query: str, params=()) -> list:
+        with self._cursor() as cursor:
+            cursor.execute(self._sql(query), params)
+            return cursor.fetchall()
+
+    def ensure_tag_column(self, table: str):
+        """
+        Adds the tag column (and an index on it) to table when missing.
+        """
+        if table in self._tag_column_checked:
+            return
+        if self.tag_column.lower() not in self._columns(table):
+            logger.info(f"Adding {self.tag_column} column to {table} for tagged test data")
+            try:
+                self.execute(f"ALTER TABLE {table} ADD COLUMN {self.tag_column} VARCHAR(64) NULL")
+                self.execute(f"CREATE INDEX idx_{table}_{self.tag_column} ON {table} ({self.tag_column})")
+            except Exception:
+                # Another xdist worker may have added it first
+                if self.tag_column.lower() not in self._columns(table):
+                    raise
+        self._tag_column_checked.add(table)
+
+    def _columns(self, table: str) -> list:
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT * FROM {table} WHERE 1 = 0")
+            return [d[0].lower() for d in cursor.description]
+
+    def bulk_insert(self, table: str, rows: list, batch_size: int = None) -> int:
+        """
+        Inserts a list of dicts with executemany, batch_size rows per round trip.
+        Rows are tagged with self.tag (when set) so they can be removed by cleanup().
+        Returns number of inserted rows.
+        """
+        if not rows:
+            return 0
+        batch_size = batch_size or self.batch_size
+        if self.tag:
+            self.ensure_tag_column(table)
+
+        columns = list(rows[0].keys())
+        if self.tag and self.tag_column not in columns:
+            columns.append(self.tag_column)
+        query = self._sql(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        )
+
+        start = time.time()
+        inserted = 0
+        with self._cursor() as cursor:
+            for i in range(0, len(rows), batch_size):
+                batch = [
+                    tuple(self.tag if col == self.tag_column and self.tag else row.get(col) for col in columns)
+                    for row in rows[i:i + batch_size]
+                ]
+                cursor.executemany(query, batch)
+                inserted += len(batch)
+
+        if self.tag and table not in self._tagged_tables:
+            self._tagged_tables.append(table)
+        logger.info(f"Seeded {inserted} rows into {table} in {time.time() - start:.2f}s")
+        return inserted
+
+    def cleanup(self, tag: str = None, tables: list = None) -> int:
+        """
+        Deletes rows carrying the given tag (defaults to self.tag), newest table first
+        so child rows go before their parents.
+        """
+        tag = tag or self.tag
+        if not tag:
+            return 0
+        deleted = 0
+        for table in reversed(tables or self._tagged_tables):
+            deleted += self.execute(f"DELETE FROM {table} WHERE {self.tag_column} = %s", (tag,))
+        return deleted
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.rollback()
+            finally:
+                self.pool.release(self._conn)
+                self._conn = None
+        else:
+            deleted = self.cleanup()
+            if deleted:
+                logger.info(f"Removed {deleted} seeded rows tagged '{self.tag}'")
+
+
+def seed_once(lock_dir: str, key: str, seed_fn, timeout: int = 120) -> bool:
+    """
+    Runs seed_fn exactly once across all xdist workers sharing lock_dir.
+    Returns True for the worker that performed the seeding.
+    """
+    os.makedirs(lock_dir, exist_ok=True)
+    lock_file = os.path.join(lock_dir, f"{key}.lock")
+    done_file = os.path.join(lock_dir, f"{key}.done")
+
+    end_time = time.time() + timeout
+    while True:
+        if os.path.exists(done_file):
+            return False
+        try:
+            fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if time.time() > end_time:
+                raise TimeoutError(f"Timed out waiting for seed '{key}' held by another worker.")
+            time.sleep(0.2)
+
+    try:
+        if os.path.exists(done_file):
+            return False
+        seed_fn()
+        with open(done_file, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+    finally:
+        os.close(fd)
+        os.remove(lock_file)
@@ -7,6 +7,9 @@ from utils.logger import get_logger
 
 logger = get_logger()
 
+# nodeid -> attempts used by retry_on_failure, read by the run-history hook
+RETRY_ATTEMPTS = {}
+
 # ----------------------------------------------------------
 # 📸 Decorator: Capture Screenshot on Failure
 # ----------------------------------------------------------
@@ -79,9 +82,13 @@ def retry_on_failure(retries=2, delay=2):
                     logout_obj = obj
                     break
 
+            # PYTEST_CURRENT_TEST is "<nodeid> (call)" while the test body runs
+            nodeid = os.environ.get("PYTEST_CURRENT_TEST", "").rsplit(" (", 1)[0]
+
             for attempt in range(1, retries + 1):
                 try:
                     kwargs["retry_count"] = attempt
+                    RETRY_ATTEMPTS[nodeid] = attempt
                     return func(*args, **kwargs)
                 except AssertionError:
                     raise
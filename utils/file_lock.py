@@ -0,0 +1,65 @@
+"""
+Cross-process locks shared by xdist workers.
+
+Built on OS advisory locks (fcntl.flock, msvcrt.locking on Windows): the OS drops
+the lock when the holding process exits, so a killed run never leaves a stale
+lock behind. The lock file itself is left in place and reused.
+"""
+import os
+import time
+
+
+def try_lock(fd) -> bool:
+    """
+    Non-blocking exclusive lock on an open descriptor, True when acquired.
+    Closing the descriptor releases it.
+    """
+    try:
+        import fcntl
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except ImportError:
+        import msvcrt
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+    except OSError:
+        return False
+
+
+class FileLock:
+    """
+    Exclusive lock on `path` for the duration of a with-block.
+    Raises TimeoutError when another process holds it for longer than timeout seconds.
+    """
+
+    def __init__(self, path: str, timeout: float = 30):
+        self.path = path
+        self.timeout = timeout
+        self.fd = None
+
+    def acquire(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        end_time = time.time() + self.timeout
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+            if try_lock(fd):
+                self.fd = fd
+                return self
+            os.close(fd)
+            if time.time() > end_time:
+                raise TimeoutError(f"Lock {self.path} still held after {self.timeout:.0f}s.")
+            time.sleep(0.1)
+
+    def release(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
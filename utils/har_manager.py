@@ -0,0 +1,160 @@
+import json
+import os
+import re
+import time
+import zipfile
+
+from utils.config_reader import get_config, get_config_value, get_path
+from utils.file_lock import FileLock
+from utils.logger import get_logger
+
+logger = get_logger()
+
+HAR_ENTRY = "har.har"
+
+
+class HarManager:
+    """
+    Record / replay of network traffic for one test or page flow.
+
+    record : traffic is captured with context.route_from_har(update=True) into a per-worker
+             file, then pruned, re-compressed and moved over the flow's HAR under a lock
+             after the context closes (several xdist workers may record one shared flow).
+    replay : requests are served from the HAR zip, nothing goes to the network for
+             URLs inside the filter. Missing or stale HARs fall back per `on_missing`.
+    off    : no-op.
+    """
+
+    def __init__(self, flow: str, mode: str = None):
+        self.flow = re.sub(r"[^A-Za-z0-9_.-]+", "_", flow)
+        self.mode = (mode or os.environ.get("E2E_HAR_MODE") or get_config_value("HAR", "mode")).lower()
+        self.url_filter = get_config_value("HAR", "url_filter") or None
+        self.har_dir = get_path("har_dir")
+        self.path = os.path.join(self.har_dir, f"{self.flow}.zip")
+        self.meta_path = os.path.join(self.har_dir, f"{self.flow}.json")
+        worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        self.record_path = os.path.join(self.har_dir, f"{self.flow}.{worker}.{os.getpid()}.recording.zip")
+        self.active_mode = "off"
+
+    # ----------------------
+    # Staleness
+    # ----------------------
+    def stale_reason(self):
+        """
+        :return: str : why the recorded HAR cannot be replayed, None when it is usable
+        """
+        if not os.path.exists(self.path) or not os.path.exists(self.meta_path):
+            return "no recording"
+        with open(self.meta_path) as f:
+            meta = json.load(f)
+
+        max_age_days = float(get_config_value("HAR", "max_age_days"))
+        age_days = (time.time() - meta.get("recorded_at", 0)) / 86400
+        if age_days > max_age_days:
+            return f"recorded {age_days:.1f} days ago (max {max_age_days})"
+        base_url = get_config("ORANGE_HRM", "URL", "orange_hrm")
+        if meta.get("base_url") != base_url:
+            return f"recorded against {meta.get('base_url')}, config points to {base_url}"
+        return None
+
+    # ----------------------
+    # Context wiring
+    # ----------------------
+    def attach(self, context) -> str:
+        """
+        Wires the browser context for the configured mode, returns the mode actually used.
+        """
+        mode = self.mode
+        if mode == "replay":
+            reason = self.stale_reason()
+            if reason:
+                on_missing = get_config_value("HAR", "on_missing").lower()
+                if on_missing == "fail":
+                    raise FileNotFoundError(f"HAR for flow '{self.flow}' cannot be replayed: {reason}")
+                logger.warning(f"HAR for flow '{self.flow}' not replayable ({reason}), using '{on_missing}' mode")
+                mode = "record" if on_missing == "record" else "off"
+
+        if mode == "record":
+            os.makedirs(self.har_dir, exist_ok=True)
+            context.route_from_har(
+                self.record_path,
+                url=self.url_filter,
+                update=True,
+                update_content="attach",  # bodies stored as separate files in the zip
+                update_mode="minimal",    # only what replay needs, no timings/cookies
+            )
+        elif mode == "replay":
+            context.route_from_har(
+                self.path,
+                url=self.url_filter,
+                not_found=get_config_value("HAR", "not_found"),
+            )
+
+        self.active_mode = mode
+        logger.info(f"HAR {mode} for flow '{self.flow}'")
+        return mode
+
+    def finalize(self):
+        """
+        Call after context.close(), which is when Playwright writes the recorded HAR.
+        """
+        if self.active_mode != "record" or not os.path.exists(self.record_path):
+            return
+        removed = prune_har(self.record_path)
+        # Last worker to finish wins; the lock keeps HAR and metadata consistent
+        with FileLock(f"{self.path}.lock", timeout=60):
+            os.replace(self.record_path, self.path)
+            with open(self.meta_path, "w") as f:
+                json.dump({
+                    "flow": self.flow,
+                    "recorded_at": time.time(),
+                    "base_url": get_config("ORANGE_HRM", "URL", "orange_hrm"),
+                    "size_bytes": os.path.getsize(self.path),
+                    "pruned_entries": removed,
+                }, f, indent=4)
+        logger.info(f"HAR recorded for flow '{self.flow}': {self.path} ({removed} entries pruned)")
+
+
+def prune_har(path: str) -> int:
+    """
+    Drops failed, duplicate and ignored-host entries from a HAR zip, removes body files
+    no longer referenced and rewrites the archive with maximum deflate compression.
+    Returns number of entries removed.
+    """
+    ignore_hosts = [h.strip() for h in get_config_value("HAR", "prune_hosts").split(",") if h.strip()]
+
+    with zipfile.ZipFile(path) as zf:
+        har = json.loads(zf.read(HAR_ENTRY))
+        files = {name: zf.read(name) for name in zf.namelist() if name != HAR_ENTRY}
+
+    entries = har["log"]["entries"]
+    kept = {}
+    for entry in entries:
+        request, response = entry["request"], entry.get("response", {})
+        if response.get("status", 0) <= 0:
+            continue
+        if any(host in request["url"] for host in ignore_hosts):
+            continue
+        # Replay picks the candidate matching the most request headers and the first one
+        # on a tie, so only entries identical in everything it compares are redundant.
+        # With update_content="attach" the body lives in postData._file, not text.
+        post_data = request.get("postData") or {}
+        headers = tuple(sorted((h["name"].lower(), h["value"]) for h in request.get("headers", [])))
+        key = (request["method"], request["url"], post_data.get("text"), post_data.get("_file"), headers)
+        kept.setdefault(key, entry)
+    har["log"]["entries"] = list(kept.values())
+
+    referenced = {
+        e["response"]["content"].get("_file") for e in har["log"]["entries"]
+    } | {
+        (e["request"].get("postData") or {}).get("_file") for e in har["log"]["entries"]
+    }
+
+    tmp_path = f"{path}.tmp"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+        zf.writestr(HAR_ENTRY, json.dumps(har, separators=(",", ":")))
+        for name, data in files.items():
+            if name in referenced:
+                zf.writestr(name, data)
+    os.replace(tmp_path, path)
+    return len(entries) - len(har["log"]["entries"])
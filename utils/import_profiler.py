@@ -0,0 +1,92 @@
+"""
+Import-time profile of test collection.
+
+Runs `python -X importtime -m pytest --collect-only` and summarises the slowest
+imports into test_output/reports/import_time.json.
+
+Usage:
+    python -m utils.import_profiler [--top 25] [extra pytest args...]
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from utils.config_reader import ROOT_DIR
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    :param stderr: str : stderr of a `-X importtime` run
+    :return: list : one dict per imported module (self / cumulative time in ms, nesting depth)
+    """
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules.append({
+            "module": name,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "depth": (len(indent) - 1) // 2,
+        })
+    return modules
+
+
+def summarise(modules: list, top: int = 25) -> dict:
+    # Top-level imports are the ones conftest/test modules pull in directly
+    top_level = [m for m in modules if m["depth"] == 0]
+    packages = {}
+    for m in modules:
+        root = m["module"].split(".")[0]
+        packages[root] = packages.get(root, 0) + m["self_ms"]
+
+    return {
+        "total_import_ms": round(sum(m["self_ms"] for m in modules), 3),
+        "module_count": len(modules),
+        "slowest_top_level": sorted(top_level, key=lambda m: m["cumulative_ms"], reverse=True)[:top],
+        "slowest_packages": [
+            {"package": name, "self_ms": round(ms, 3)}
+            for name, ms in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        ],
+    }
+
+
+def profile_collection(pytest_args: list, top: int = 25) -> dict:
+    cmd = [sys.executable, "-X", "importtime", "-m", "pytest", "--collect-only", "-q", *pytest_args]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT_DIR, capture_output=True, text=True)
+    report = summarise(parse_importtime(proc.stderr), top)
+    report["collection_wall_s"] = round(time.perf_counter() - start, 3)
+    report["pytest_exit_code"] = proc.returncode
+    report["command"] = " ".join(cmd)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise import time of pytest collection.")
+    parser.add_argument("--top", type=int, default=25, help="number of entries per table")
+    parser.add_argument("--output", default=os.path.join(ROOT_DIR, "test_output", "reports", "import_time.json"))
+    args, pytest_args = parser.parse_known_args(argv)
+
+    report = profile_collection(pytest_args, args.top)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+
+    print(f"Collection took {report['collection_wall_s']}s, "
+          f"{report['total_import_ms']:.1f} ms in {report['module_count']} imports")
+    for m in report["slowest_top_level"]:
+        print(f"{m['cumulative_ms']:>10.1f} ms  {m['module']}")
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Self-healing locators.
+
+Each logical element has a chain of selectors: the primary one from its config
+section plus alternates from a *_FALLBACKS section, e.g.
+
+    [LOGIN_FALLBACKS]
+    login_button_xpath = role=button[name="Login"] || text=Login
+
+Entries are `kind=value` with kind one of css, xpath, testid, text, role.
+BasePage probes the whole chain in one page.evaluate() call. The primary is always
+probed first, so a fixed primary is picked up again at once. The fallback that
+resolved last is kept in an index (persisted between runs) and tried before the
+other fallbacks; it is dropped from the index as soon as the primary resolves.
+Every use of a fallback is reported, i.e. only locators whose primary is broken.
+"""
+import json
+import os
+import re
+
+from utils.config_reader import config_reader, get_path
+from utils.file_lock import FileLock
+from utils.logger import get_logger
+
+logger = get_logger()
+
+SEPARATOR = "||"
+ROLE_PATTERN = re.compile(r"^([a-z]+)(?:\[name=[\"'](.*)[\"']\])?$")
+
+# Runs in the page: index of the first spec with a visible match, -1 if none
+PROBE_JS = """
+(specs) => {
+    const visible = (el) => {
+        if (!el.getClientRects().length) return false;
+        const style = getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none';
+    };
+    const implicitRoles = {
+        button: 'button, input[type=submit], input[type=button], [role=button]',
+        textbox: 'input:not([type]), input[type=text], input[type=email], input[type=password], textarea, [role=textbox]',
+        link: 'a[href], [role=link]',
+        menuitem: '[role=menuitem]',
+        checkbox: 'input[type=checkbox], [role=checkbox]',
+        heading: 'h1, h2, h3, h4, h5, h6, [role=heading]',
+    };
+    const accessibleName = (el) => (
+        el.getAttribute('aria-label') || (el.labels && el.labels[0] && el.labels[0].innerText) ||
+        el.getAttribute('placeholder') || el.innerText || el.value || ''
+    ).trim();
+    const find = (spec) => {
+        switch (spec.kind) {
+            case 'xpath': {
+                const snap = document.evaluate(spec.value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                return Array.from({length: snap.snapshotLength}, (_, i) => snap.snapshotItem(i));
+            }
+            case 'testid':
+                return Array.from(document.querySelectorAll(
+                    ['data-testid', 'data-test', 'data-test-id'].map(a => `[${a}="${CSS.escape(spec.value)}"]`).join(',')));
+            case 'text':
+                return Array.from(document.querySelectorAll('body *')).filter(el =>
+                    el.innerText && el.innerText.trim() === spec.value &&
+                    !Array.from(el.children).some(c => c.innerText && c.innerText.trim() === spec.value));
+            case 'role':
+                return Array.from(document.querySelectorAll(implicitRoles[spec.role] || `[role=${spec.role}]`))
+                    .filter(el => !spec.name || accessibleName(el).includes(spec.name));
+            default:
+                return Array.from(document.querySelectorAll(spec.value));
+        }
+    };
+    for (let i = 0; i < specs.length; i++) {
+        try {
+            if (find(specs[i]).some(visible)) return i;
+        } catch (e) {
+            // invalid selector for this document, try the next one
+        }
+    }
+    return -1;
+}
+"""
+
+_chains = {}
+_index = None
+# element name -> fallback remembered in this process, None when its primary resolved
+_index_updates = {}
+_resolved = {}
+fallback_uses = []
+
+
+def _index_path() -> str:
+    return get_path("locator_index")
+
+
+def _read_index() -> dict:
+    if not os.path.exists(_index_path()):
+        return {}
+    try:
+        with open(_index_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable locator index: {e}")
+        return {}
+
+
+def _load_index() -> dict:
+    global _index
+    if _index is None:
+        _index = _read_index()
+    return _index
+
+
+def _normalise(entry: str) -> str:
+    entry = entry.strip()
+    if re.match(r"^(css|xpath|testid|text|role)=", entry):
+        return entry
+    return f"xpath={entry}" if entry.startswith(("/", "(")) else f"css={entry}"
+
+
+def register_section(section: str, fallback_section: str, module: str = ""):
+    """
+    Registers a selector chain for every key of `section` that has alternates
+    in `fallback_section`. Chains are keyed by the primary selector string.
+    """
+    config = config_reader(module)
+    if not config.has_section(fallback_section):
+        return
+    for key, alternates in config.items(fallback_section):
+        if not config.has_option(section, key):
+            continue
+        primary = config.get(section, key)
+        if primary not in _chains:
+            _chains[primary] = {
+                "name": f"{section}.{key}",
+                "chain": [_normalise(primary)] + [_normalise(a) for a in alternates.split(SEPARATOR) if a.strip()],
+            }
+
+
+def chain_for(locator) -> list:
+    """
+    :return: list : selector chain for a registered primary selector; primary first,
+                    then the fallback that resolved last, then the other fallbacks
+    """
+    entry = _chains.get(locator) if isinstance(locator, str) else None
+    if not entry:
+        return []
+    primary, fallbacks = entry["chain"][0], entry["chain"][1:]
+    remembered = _load_index().get(entry["name"])
+    if remembered in fallbacks:
+        fallbacks = [remembered] + [c for c in fallbacks if c != remembered]
+    return [primary] + fallbacks
+
+
+def probe_specs(chain: list) -> list:
+    specs = []
+    for entry in chain:
+        kind, _, value = entry.partition("=")
+        spec = {"kind": kind, "value": value}
+        if kind == "role":
+            match = ROLE_PATTERN.match(value)
+            spec["role"], spec["name"] = (match.group(1), match.group(2)) if match else (value, None)
+        specs.append(spec)
+    return specs
+
+
+def playwright_selector(entry: str) -> str:
+    kind, _, value = entry.partition("=")
+    if kind == "testid":
+        return "css=" + ", ".join(f"[{attr}=\"{value}\"]" for attr in ("data-testid", "data-test", "data-test-id"))
+    if kind == "text":
+        return f"text=\"{value}\""
+    return entry
+
+
+def remember(locator: str, entry: str):
+    """
+    Records which chain entry resolved; fallbacks (anything but the primary) are
+    remembered and reported, a resolving primary clears the remembered fallback.
+    """
+    chain_entry = _chains[locator]
+    name = chain_entry["name"]
+    _resolved[locator] = playwright_selector(entry)
+    index = _load_index()
+    if entry == chain_entry["chain"][0]:
+        if name in index:
+            del index[name]
+            _index_updates[name] = None
+        return
+    if index.get(name) != entry:
+        index[name] = entry
+        _index_updates[name] = entry
+
+    use = {"element": name, "primary": chain_entry["chain"][0], "resolved_by": entry}
+    if use not in fallback_uses:
+        fallback_uses.append(use)
+        logger.warning(f"Locator fallback for {name}: '{use['primary']}' -> '{entry}'")
+
+
+def resolved(locator):
+    """
+    Selector to hand to page.locator(): the one that resolved last, else the locator itself.
+    """
+    return _resolved.get(locator, locator) if isinstance(locator, str) else locator
+
+
+def save_index():
+    """
+    Merges this process's index changes into the file under a file lock,
+    so parallel xdist workers do not drop each other's entries.
+    """
+    global _index
+    if not _index_updates:
+        return
+    os.makedirs(os.path.dirname(_index_path()), exist_ok=True)
+    try:
+        lock = FileLock(f"{_index_path()}.lock", timeout=30).acquire()
+    except TimeoutError as e:
+        logger.warning(f"Locator index is locked, changes not saved: {e}")
+        return
+
+    try:
+        merged = _read_index()
+        for name, entry in _index_updates.items():
+            if entry is None:
+                merged.pop(name, None)
+            else:
+                merged[name] = entry
+        tmp_path = f"{_index_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(merged, f, indent=4)
+        os.replace(tmp_path, _index_path())
+        _index = merged
+        _index_updates.clear()
+    finally:
+        lock.release()
@@ -0,0 +1,219 @@
+"""
+Browser resource governor for high-density parallel (xdist) runs.
+
+- caps concurrent browsers per host with OS file locks shared by every worker
+- low-memory Chromium flags and video only when needed
+- samples RSS / CPU of the worker's browser processes (Linux /proc)
+- throttles a worker before launching while the host is short on memory or CPU
+"""
+import os
+import tempfile
+import threading
+import time
+
+from utils.config_reader import get_config_value
+from utils.file_lock import try_lock
+from utils.logger import get_logger
+
+logger = get_logger()
+
+LOW_MEMORY_ARGS = [
+    "--disable-gpu",
+    "--disable-dev-shm-usage",  # use /tmp instead of the (often tiny) /dev/shm
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--mute-audio",
+    "--js-flags=--max-old-space-size=512",
+]
+
+
+def _setting(key: str) -> str:
+    return get_config_value("RESOURCES", key)
+
+
+def low_memory() -> bool:
+    return _setting("low_memory").lower() == "true"
+
+
+def launch_args(base_args: list) -> list:
+    return base_args + (LOW_MEMORY_ARGS if low_memory() else [])
+
+
+def video_enabled(request) -> bool:
+    """
+    video = on | off | auto. auto records only when low-memory mode is off
+    or the test is marked @pytest.mark.video.
+    """
+    mode = _setting("video").lower()
+    if mode in ("on", "off"):
+        return mode == "on"
+    return not low_memory() or request.node.get_closest_marker("video") is not None
+
+
+# ----------------------
+# Host-wide browser cap
+# ----------------------
+class BrowserSlot:
+    """
+    One of max_browsers lock files in the temp dir. The OS drops the lock when the
+    holding process dies, so crashed workers never leak a slot.
+    """
+
+    def __init__(self):
+        self.max_browsers = int(_setting("max_browsers"))
+        self.timeout = float(_setting("slot_timeout"))
+        self.lock_dir = os.path.join(tempfile.gettempdir(), "e2e_browser_slots")
+        self.fd = None
+        self.index = None
+
+    def acquire(self):
+        if self.max_browsers <= 0:
+            return self
+        os.makedirs(self.lock_dir, exist_ok=True)
+        start = time.time()
+        while True:
+            for index in range(self.max_browsers):
+                fd = os.open(os.path.join(self.lock_dir, f"slot_{index}.lock"), os.O_RDWR | os.O_CREAT)
+                if try_lock(fd):
+                    self.fd, self.index = fd, index
+                    waited = time.time() - start
+                    if waited > 1:
+                        logger.info(f"Browser slot {index} acquired after {waited:.1f}s")
+                    return self
+                os.close(fd)
+            if time.time() - start > self.timeout:
+                raise TimeoutError(f"No browser slot free within {self.timeout:.0f}s (max_browsers={self.max_browsers}).")
+            time.sleep(0.5)
+
+    def release(self):
+        if self.fd is not None:
+            # Closing the descriptor releases the lock
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+# ----------------------
+# Host load / throttling
+# ----------------------
+def _mem_available_mb():
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _load_per_cpu():
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return None
+
+
+def wait_for_headroom() -> float:
+    """
+    Blocks this worker while free memory or CPU load is past the thresholds,
+    up to throttle_max_wait seconds. Returns seconds waited.
+    """
+    min_free_mb = float(_setting("min_free_mb"))
+    max_load = float(_setting("max_load_per_cpu"))
+    max_wait = float(_setting("throttle_max_wait"))
+    start = time.time()
+    delay = 0.5
+    while time.time() - start < max_wait:
+        free_mb, load = _mem_available_mb(), _load_per_cpu()
+        if (free_mb is None or free_mb >= min_free_mb) and (load is None or load <= max_load):
+            break
+        logger.info(f"Throttling browser launch: {free_mb or 0:.0f} MB free, load/cpu {load or 0:.2f}")
+        time.sleep(delay)
+        delay = min(delay * 2, 5)
+    return time.time() - start
+
+
+# ----------------------
+# Browser process sampling
+# ----------------------
+class ResourceSampler(threading.Thread):
+    """
+    Samples RSS and CPU of every descendant process of this worker (Playwright driver
+    and the browsers it launched) and keeps the peaks. No-op where /proc is missing.
+    """
+
+    def __init__(self, interval: float = None):
+        super().__init__(daemon=True)
+        self.interval = interval or float(_setting("sample_interval"))
+        self.peak_rss_mb = 0.0
+        self.peak_cpu_percent = 0.0
+        self.samples = 0
+        self._stop_event = threading.Event()
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    @staticmethod
+    def _descendants(root: int) -> list:
+        children = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    # Fields after the parenthesised command name: state, ppid, ...
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+
+        found, stack = [], [root]
+        while stack:
+            for child in children.get(stack.pop(), []):
+                found.append(child)
+                stack.append(child)
+        return found
+
+    def _sample(self) -> tuple:
+        rss, cpu = 0, {}
+        for pid in self._descendants(os.getpid()):
+            try:
+                with open(f"/proc/{pid}/statm") as f:
+                    rss += int(f.read().split()[1]) * self._page_size
+                with open(f"/proc/{pid}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+                    cpu[pid] = int(fields[11]) + int(fields[12])  # utime + stime
+            except (OSError, IndexError, ValueError):
+                continue
+        return rss / (1024 * 1024), cpu
+
+    def run(self):
+        if not os.path.isdir("/proc"):
+            return
+        last_cpu, last_time = {}, time.time()
+        while not self._stop_event.is_set():
+            rss_mb, cpu = self._sample()
+            now = time.time()
+            used = sum(ticks - last_cpu[pid] for pid, ticks in cpu.items() if pid in last_cpu)
+            if last_cpu and now > last_time:
+                self.peak_cpu_percent = max(self.peak_cpu_percent, used / self._ticks / (now - last_time) * 100)
+            self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+            self.samples += 1
+            last_cpu, last_time = cpu, now
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> dict:
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=self.interval * 2)
+        return {
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "peak_cpu_percent": round(self.peak_cpu_percent, 1),
+            "samples": self.samples,
+        }
@@ -0,0 +1,260 @@
+"""
+Append-only run history of test outcomes with flakiness / slowdown analytics.
+
+Recording is enabled by [RUN_HISTORY] enabled or the E2E_RUN_HISTORY env var.
+
+Storage (history_dir, E2E_HISTORY_DIR env var overrides):
+    results.bin : fixed-size binary records (RECORD_DTYPE), appended by every xdist worker
+    names.tsv   : test_id <TAB> nodeid, appended the first time a test is seen
+
+Usage:
+    python -m utils.run_history [--runs 200] [--top 20] [--json path]
+"""
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from utils.config_reader import get_config_value, get_path
+
+RECORD_DTYPE = np.dtype([
+    ("run_id", "<u8"),
+    ("test_id", "<u8"),
+    ("timestamp", "<f8"),
+    ("duration", "<f4"),
+    ("outcome", "u1"),
+    ("retries", "u1"),
+])
+OUTCOMES = {"passed": 0, "failed": 1, "skipped": 2, "error": 3}
+
+_known_ids = None
+
+
+def _paths() -> tuple:
+    history_dir = os.environ.get("E2E_HISTORY_DIR") or get_path("history_dir")
+    return os.path.join(history_dir, "results.bin"), os.path.join(history_dir, "names.tsv")
+
+
+def hash_nodeid(nodeid: str) -> int:
+    # Stable across runs and workers, so no shared counter is needed
+    return int.from_bytes(hashlib.blake2b(nodeid.encode(), digest_size=8).digest(), "little")
+
+
+# ----------------------
+# Writing
+# ----------------------
+def append_result(run_id: str, nodeid: str, outcome: str, duration: float, retries: int, timestamp: float):
+    """
+    Appends one record. A single O_APPEND write per record keeps concurrent
+    xdist workers from interleaving partial records.
+    """
+    global _known_ids
+    results_file, names_file = _paths()
+    os.makedirs(os.path.dirname(results_file), exist_ok=True)
+
+    tid = hash_nodeid(nodeid)
+    if _known_ids is None:
+        _known_ids = set(load_names(names_file))
+    if tid not in _known_ids:
+        _known_ids.add(tid)
+        with open(names_file, "a", encoding="utf-8") as f:
+            f.write(f"{tid}\t{nodeid}\n")
+
+    # Run ids may come from CI (E2E_RUN_ID=ci-build-42), so hash rather than parse them
+    record = np.array(
+        [(hash_nodeid(run_id), tid, timestamp, duration, OUTCOMES[outcome], min(retries, 255))],
+        dtype=RECORD_DTYPE,
+    )
+    fd = os.open(results_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, record.tobytes())
+    finally:
+        os.close(fd)
+
+
+# ----------------------
+# Reading
+# ----------------------
+def load_names(names_file: str = None) -> dict:
+    names_file = names_file or _paths()[1]
+    names = {}
+    if os.path.exists(names_file):
+        with open(names_file, encoding="utf-8") as f:
+            for line in f:
+                tid, _, nodeid = line.rstrip("\n").partition("\t")
+                if nodeid:
+                    names[int(tid)] = nodeid
+    return names
+
+
+def load_records(last_runs: int = None) -> np.ndarray:
+    """
+    Memory-maps results.bin; with last_runs only records of the newest runs are returned.
+    """
+    results_file = _paths()[0]
+    if not os.path.exists(results_file):
+        return np.empty(0, dtype=RECORD_DTYPE)
+    # Ignore a trailing partial record from a writer that is still running
+    count = os.path.getsize(results_file) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    records = np.memmap(results_file, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+
+    if last_runs:
+        run_ids, first_index = np.unique(records["run_id"], return_index=True)
+        # Runs in the order they started writing
+        recent = run_ids[np.argsort(first_index)][-last_runs:]
+        records = records[np.isin(records["run_id"], recent)]
+    return np.asarray(records)
+
+
+# ----------------------
+# Queries (vectorized)
+# ----------------------
+def _group_percentile(ids: np.ndarray, values: np.ndarray, q: float) -> tuple:
+    """
+    Per-group nearest-rank percentile without a Python loop over groups.
+    :return: tuple : (unique ids, percentile per id, sample count per id)
+    """
+    order = np.lexsort((values, ids))
+    sorted_ids, sorted_values = ids[order], values[order]
+    unique_ids, starts, counts = np.unique(sorted_ids, return_index=True, return_counts=True)
+    rank = np.clip(np.ceil(q * counts).astype(np.int64) - 1, 0, None)
+    return unique_ids, sorted_values[starts + rank], counts
+
+
+def time_hogs(records: np.ndarray, top: int = 20) -> list:
+    """
+    Tests ranked by total time spent across the selected runs.
+    """
+    if records.size == 0:
+        return []
+    unique_ids, inverse = np.unique(records["test_id"], return_inverse=True)
+    total = np.bincount(inverse, weights=records["duration"])
+    runs = np.bincount(inverse)
+    grand_total = total.sum()
+    order = np.argsort(total)[::-1][:top]
+    return [
+        {"test_id": int(unique_ids[i]), "total_s": round(float(total[i]), 3), "runs": int(runs[i]),
+         "mean_s": round(float(total[i] / runs[i]), 3), "share": round(float(total[i] / grand_total), 4)}
+        for i in order
+    ]
+
+
+def flaky_tests(records: np.ndarray, min_runs: int = 5, top: int = 20) -> list:
+    """
+    Flakiness score = (pass/fail flips between consecutive runs + passes that needed
+    a retry) / runs. Skipped results are ignored.
+    """
+    records = records[records["outcome"] != OUTCOMES["skipped"]]
+    if records.size == 0:
+        return []
+    records = records[np.lexsort((records["timestamp"], records["test_id"]))]
+    ids = records["test_id"]
+    failed = records["outcome"] != OUTCOMES["passed"]
+
+    same_test = np.concatenate(([False], ids[1:] == ids[:-1]))
+    flips = same_test & np.concatenate(([False], failed[1:] != failed[:-1]))
+    retried_pass = ~failed & (records["retries"] > 0)
+
+    unique_ids, inverse = np.unique(ids, return_inverse=True)
+    runs = np.bincount(inverse)
+    fails = np.bincount(inverse, weights=failed)
+    score = (np.bincount(inverse, weights=flips) + np.bincount(inverse, weights=retried_pass)) / runs
+
+    candidates = np.nonzero((runs >= min_runs) & (score > 0) & (fails < runs))[0]
+    order = candidates[np.argsort(score[candidates])[::-1]][:top]
+    return [
+        {"test_id": int(unique_ids[i]), "score": round(float(score[i]), 3), "runs": int(runs[i]),
+         "fail_rate": round(float(fails[i] / runs[i]), 3)}
+        for i in order
+    ]
+
+
+def slowdowns(records: np.ndarray, recent_runs: int = 10, ratio: float = 1.5, min_samples: int = 3,
+              top: int = 20) -> list:
+    """
+    Compares each test's p95 duration in the newest recent_runs runs against its p95
+    in the older runs and reports tests that got at least `ratio` times slower.
+    """
+    records = records[records["outcome"] == OUTCOMES["passed"]]
+    if records.size == 0:
+        return []
+    run_ids, first_index = np.unique(records["run_id"], return_index=True)
+    recent = np.isin(records["run_id"], run_ids[np.argsort(first_index)][-recent_runs:])
+    older, newer = records[~recent], records[recent]
+    if older.size == 0 or newer.size == 0:
+        return []
+
+    base_ids, base_p95, base_n = _group_percentile(older["test_id"], older["duration"], 0.95)
+    new_ids, new_p95, new_n = _group_percentile(newer["test_id"], newer["duration"], 0.95)
+    common, base_idx, new_idx = np.intersect1d(base_ids, new_ids, return_indices=True)
+
+    enough = (base_n[base_idx] >= min_samples) & (new_n[new_idx] >= min_samples)
+    slowdown = new_p95[new_idx] / np.maximum(base_p95[base_idx], 1e-3)
+    hits = np.nonzero(enough & (slowdown >= ratio))[0]
+    order = hits[np.argsort(slowdown[hits])[::-1]][:top]
+    return [
+        {"test_id": int(common[i]), "slowdown": round(float(slowdown[i]), 2),
+         "baseline_p95_s": round(float(base_p95[base_idx[i]]), 3),
+         "recent_p95_s": round(float(new_p95[new_idx[i]]), 3)}
+        for i in order
+    ]
+
+
+# ----------------------
+# Report / CLI
+# ----------------------
+def build_report(last_runs: int = None, top: int = 20) -> dict:
+    last_runs = last_runs or int(get_config_value("RUN_HISTORY", "report_runs"))
+    records = load_records(last_runs)
+    names = load_names()
+    report = {
+        "runs": int(np.unique(records["run_id"]).size),
+        "results": int(records.size),
+        "time_hogs": time_hogs(records, top),
+        "flaky": flaky_tests(records, int(get_config_value("RUN_HISTORY", "flaky_min_runs")), top),
+        "slowdowns": slowdowns(
+            records,
+            recent_runs=int(get_config_value("RUN_HISTORY", "recent_runs")),
+            ratio=float(get_config_value("RUN_HISTORY", "slowdown_ratio")),
+            top=top,
+        ),
+    }
+    for section in ("time_hogs", "flaky", "slowdowns"):
+        for row in report[section]:
+            row["test"] = names.get(row["test_id"], str(row["test_id"]))
+    return report
+
+
+def _print_table(title: str, rows: list, columns: list):
+    print(f"\n{title}")
+    if not rows:
+        print("  (none)")
+        return
+    for row in rows:
+        print("  " + "  ".join(f"{col}={row[col]}" for col in columns) + f"  {row['test']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report flaky, slow and expensive tests from run history.")
+    parser.add_argument("--runs", type=int, default=None, help="number of most recent runs to analyse")
+    parser.add_argument("--top", type=int, default=20, help="rows per table")
+    parser.add_argument("--json", default=None, help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = build_report(args.runs, args.top)
+    print(f"{report['results']} results from {report['runs']} runs")
+    _print_table("Most CI time", report["time_hogs"], ["total_s", "mean_s", "share", "runs"])
+    _print_table("Flaky", report["flaky"], ["score", "fail_rate", "runs"])
+    _print_table("Slowed down (p95)", report["slowdowns"], ["slowdown", "baseline_p95_s", "recent_p95_s"])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
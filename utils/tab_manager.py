@@ -0,0 +1,152 @@
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+class TabManager:
+    """
+    Opens, tracks and cleans up several pages (tabs) of one browser context,
+    with page-object instances bound per tab.
+
+    The framework uses Playwright's sync API, which drives one call at a time from
+    the test thread. open_many() still loads tabs concurrently: every navigation is
+    started (wait_until="commit") before any of them is awaited, so the browser
+    fetches and renders all tabs in parallel.
+    """
+
+    def __init__(self, context, main_page=None):
+        self.context = context
+        self.main_page = main_page
+        self.tabs = {}
+        self._page_objects = {}
+
+    # ----------------------
+    # Opening tabs
+    # ----------------------
+    def open(self, name: str, url: str = None, page_cls=None, wait_until: str = "load"):
+        """
+        Opens a new tab (optionally navigating to url) and returns its page object,
+        or the raw Playwright page when page_cls is not given.
+        """
+        # Checked before the page exists, so a duplicate name never leaves an untracked tab open
+        self._ensure_free(name)
+        page = self.context.new_page()
+        self._track(name, page)
+        if url:
+            page.goto(url, wait_until=wait_until)
+        return self.get(name, page_cls)
+
+    def open_many(self, urls: dict, page_cls=None, wait_until: str = "load", timeout: int = 30000) -> dict:
+        """
+        :param urls: dict : tab name -> url
+        :return: dict : tab name -> page object (or page) once every tab reached wait_until
+        """
+        for name in urls:
+            self._ensure_free(name)
+        for name, url in urls.items():
+            page = self.context.new_page()
+            self._track(name, page)
+            page.goto(url, wait_until="commit", timeout=timeout)
+
+        for name in urls:
+            self.tabs[name].wait_for_load_state(wait_until, timeout=timeout)
+        return {name: self.get(name, page_cls) for name in urls}
+
+    def open_from_click(self, name: str, page_obj, locator: str, page_cls=None, frame_name: str = None):
+        """
+        Clicks locator on an existing page object, adopts the window it opens as tab `name`.
+        """
+        if frame_name:
+            new_page = page_obj.switch_to_window_on_frame(locator, frame_name)
+        else:
+            new_page = page_obj.switch_to_window(locator)
+        new_page.wait_for_load_state()
+        self._track(name, new_page)
+        return self.get(name, page_cls)
+
+    def adopt(self, name: str, page, page_cls=None):
+        """
+        Tracks a page opened elsewhere (popup, switch_to_window, ...) as tab `name`.
+        """
+        self._track(name, page)
+        return self.get(name, page_cls)
+
+    def _ensure_free(self, name: str):
+        if name in self.tabs and not self.tabs[name].is_closed():
+            raise ValueError(f"Tab '{name}' is already open.")
+
+    def _track(self, name: str, page):
+        self._ensure_free(name)
+        self.tabs[name] = page
+        self._page_objects[name] = {}
+
+    # ----------------------
+    # Page objects
+    # ----------------------
+    def get(self, name: str, page_cls=None):
+        """
+        Returns the page object of class page_cls bound to tab `name` (cached per tab),
+        or the raw Playwright page when page_cls is None.
+        """
+        page = self.tabs[name]
+        if page_cls is None:
+            return page
+        bound = self._page_objects[name]
+        if page_cls not in bound:
+            bound[page_cls] = page_cls(page)
+        return bound[page_cls]
+
+    def verify_pending_visuals(self):
+        """
+        Asserts queued visual checks of every page object bound to a tab.
+        """
+        from pages.orange_hrm.base_page import verify_pending_visuals
+        verify_pending_visuals([obj for bound in self._page_objects.values() for obj in bound.values()])
+
+    def bring_to_front(self, name: str, page_cls=None):
+        self.tabs[name].bring_to_front()
+        return self.get(name, page_cls)
+
+    # ----------------------
+    # Cleanup
+    # ----------------------
+    def close(self, name: str):
+        page = self.tabs.pop(name)
+        self._page_objects.pop(name, None)
+        if not page.is_closed():
+            page.close()
+
+    def orphans(self) -> list:
+        """
+        Open pages of the context that are neither the main page nor a tracked tab,
+        e.g. popups nobody switched to.
+        """
+        tracked = list(self.tabs.values()) + [self.main_page]
+        return [p for p in self.context.pages if not any(p is t for t in tracked)]
+
+    def close_orphans(self) -> int:
+        # Forget tabs the app closed itself, then close untracked pages
+        for name in [n for n, p in self.tabs.items() if p.is_closed()]:
+            self.tabs.pop(name)
+            self._page_objects.pop(name, None)
+
+        orphans = self.orphans()
+        for page in orphans:
+            try:
+                page.close()
+            except Exception as e:
+                logger.warning(f"Could not close orphaned page {page.url}: {e}")
+        if orphans:
+            logger.info(f"Closed {len(orphans)} orphaned page(s)")
+        return len(orphans)
+
+    def close_all(self):
+        """
+        Closes every tracked tab and orphaned page; the main page is left to its fixture.
+        """
+        for name in list(self.tabs):
+            try:
+                self.close(name)
+            except Exception as e:
+                logger.warning(f"Could not close tab '{name}': {e}")
+        self.close_orphans()
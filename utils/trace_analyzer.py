@@ -0,0 +1,212 @@
+"""
+Offline analysis of Playwright trace zips.
+
+Streams trace.trace / trace.network out of each zip (no extraction) and pulls out
+action durations, network requests and console errors.
+
+Usage:
+    python -m utils.trace_analyzer [trace zips or directories...] [--top 10] [--output path]
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.config_reader import get_config_value, get_path
+
+WATERFALL_LIMIT = 200
+
+
+def _iter_events(zf: zipfile.ZipFile, suffix: str):
+    # Traces with several chunks/pages contain e.g. trace.trace and 1-trace.trace
+    for name in zf.namelist():
+        if not name.endswith(suffix):
+            continue
+        with zf.open(name) as raw:
+            for line in io.TextIOWrapper(raw, encoding="utf-8"):
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+
+def _action_name(event: dict) -> str:
+    return event.get("apiName") or event.get("title") or f"{event.get('class', '')}.{event.get('method', '')}"
+
+
+def _action_target(params: dict) -> str:
+    for key in ("selector", "url", "expression", "key", "value"):
+        if params.get(key):
+            return str(params[key])[:200]
+    return ""
+
+
+def analyze_trace(path: str, top: int = 10) -> dict:
+    """
+    :param path: str : trace zip written by context.tracing.stop()
+    :return: dict : slowest actions, largest/slowest requests, waterfall and console errors
+    """
+    started = {}
+    actions = []
+    console_errors = []
+    requests = []
+
+    with zipfile.ZipFile(path) as zf:
+        for event in _iter_events(zf, ".trace"):
+            kind = event.get("type")
+            if kind == "before":
+                started[event["callId"]] = event
+            elif kind == "after" and event.get("callId") in started:
+                before = started.pop(event["callId"])
+                actions.append({
+                    "action": _action_name(before),
+                    "target": _action_target(before.get("params") or {}),
+                    "start_ms": before.get("startTime", 0),
+                    "duration_ms": round(event.get("endTime", 0) - before.get("startTime", 0), 1),
+                    "error": ((event.get("error") or {}).get("message") or "")[:300],
+                })
+            elif kind == "console" and event.get("messageType") == "error":
+                console_errors.append(event.get("text", "")[:500])
+            elif kind == "event" and event.get("method") == "pageError":
+                error = (event.get("params") or {}).get("error") or {}
+                console_errors.append(str((error.get("error") or error).get("message", error))[:500])
+
+        for event in _iter_events(zf, ".network"):
+            if event.get("type") != "resource-snapshot":
+                continue
+            entry = event["snapshot"]
+            response = entry.get("response") or {}
+            requests.append({
+                "url": entry["request"]["url"][:300],
+                "method": entry["request"].get("method"),
+                "status": response.get("status"),
+                "mime": (response.get("content") or {}).get("mimeType", ""),
+                "bytes": max(response.get("_transferSize", -1), (response.get("content") or {}).get("size", 0), 0),
+                "start_ms": entry.get("_monotonicTime", 0),  # already in ms, same clock as actions
+                "duration_ms": round(entry.get("time", 0), 1),
+            })
+
+    first_start = min([r["start_ms"] for r in requests] + [a["start_ms"] for a in actions] or [0])
+    waterfall = sorted(requests, key=lambda r: r["start_ms"])[:WATERFALL_LIMIT]
+    for r in requests:
+        r["start_ms"] = round(r["start_ms"] - first_start, 1)
+    for a in actions:
+        a["start_ms"] = round(a["start_ms"] - first_start, 1)
+
+    return {
+        "trace": os.path.basename(path),
+        "actions": len(actions),
+        "total_action_ms": round(sum(a["duration_ms"] for a in actions), 1),
+        "slowest_actions": sorted(actions, key=lambda a: a["duration_ms"], reverse=True)[:top],
+        "failed_actions": [a for a in actions if a["error"]][:top],
+        "requests": len(requests),
+        "transfer_bytes": sum(r["bytes"] for r in requests),
+        "largest_resources": sorted(requests, key=lambda r: r["bytes"], reverse=True)[:top],
+        "slowest_requests": sorted(requests, key=lambda r: r["duration_ms"], reverse=True)[:top],
+        # Playwright marks refused / aborted requests with status -1
+        "failed_requests": [r for r in requests if r["status"] is None or r["status"] < 100 or r["status"] >= 400][:top],
+        "console_errors": console_errors[:top],
+        "waterfall": waterfall,
+    }
+
+
+def summarise(results: list, top: int = 10) -> dict:
+    """
+    Session-wide view over per-trace results (waterfalls are left out to keep it small).
+    """
+    actions = [dict(a, trace=r["trace"]) for r in results for a in r["slowest_actions"]]
+    resources = [dict(x, trace=r["trace"]) for r in results for x in r["largest_resources"]]
+    return {
+        "traces": len(results),
+        "slowest_tests": sorted(
+            ({"trace": r["trace"], "total_action_ms": r["total_action_ms"], "requests": r["requests"],
+              "transfer_bytes": r["transfer_bytes"], "console_errors": len(r["console_errors"])} for r in results),
+            key=lambda t: t["total_action_ms"], reverse=True,
+        )[:top],
+        "slowest_actions": sorted(actions, key=lambda a: a["duration_ms"], reverse=True)[:top],
+        "largest_resources": sorted(resources, key=lambda x: x["bytes"], reverse=True)[:top],
+        "console_errors": [{"trace": r["trace"], "errors": r["console_errors"]} for r in results if r["console_errors"]],
+    }
+
+
+def analyze_traces(paths: list, top: int = 10, workers: int = None) -> list:
+    """
+    Analyses many trace zips in a process pool, skipping unreadable ones.
+    """
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(analyze_trace, path, top) for path in paths]
+        for path, future in zip(paths, futures):
+            try:
+                results.append(future.result())
+            except (zipfile.BadZipFile, OSError, KeyError) as e:
+                print(f"⚠️ Could not analyse trace {path}: {e}")
+    return results
+
+
+# ----------------------
+# Per-test / session integration
+# ----------------------
+def record_summary(result: dict, worker: str):
+    """
+    Appends a per-test result (without waterfall) to this worker's jsonl file.
+    """
+    summary_dir = get_path("trace_summary_dir")
+    os.makedirs(summary_dir, exist_ok=True)
+    compact = {k: v for k, v in result.items() if k != "waterfall"}
+    with open(os.path.join(summary_dir, f"{worker}.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(compact) + "\n")
+
+
+def write_session_summary(output: str = None) -> str:
+    """
+    Merges every worker's jsonl into one summary JSON and removes the jsonl files.
+    """
+    summary_dir = get_path("trace_summary_dir")
+    files = glob.glob(os.path.join(summary_dir, "*.jsonl"))
+    if not files:
+        return None
+    results = []
+    for name in files:
+        with open(name, encoding="utf-8") as f:
+            results.extend(json.loads(line) for line in f if line.strip())
+        os.remove(name)
+
+    output = output or os.path.join(summary_dir, "trace_summary.json")
+    with open(output, "w") as f:
+        json.dump(summarise(results, int(get_config_value("TRACE_ANALYSIS", "top"))), f, indent=4)
+    return output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise Playwright trace zips.")
+    parser.add_argument("paths", nargs="*", help="trace zips or directories (default: traces_dir)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=None, help="summary JSON path")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for p in args.paths or [get_path("traces_dir")]:
+        paths.extend(sorted(glob.glob(os.path.join(p, "*.zip"))) if os.path.isdir(p) else [p])
+
+    results = analyze_traces(paths, args.top, args.workers)
+    summary = summarise(results, args.top)
+    summary["per_trace"] = results
+    output = args.output or os.path.join(get_path("trace_summary_dir"), "trace_analysis.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(summary, f, indent=4)
+
+    print(f"Analysed {len(results)} trace(s)")
+    for a in summary["slowest_actions"]:
+        print(f"{a['duration_ms']:>10.1f} ms  {a['action']} {a['target']}  ({a['trace']})")
+    print(f"Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 from collections import OrderedDict
 import json
-import allure
 from typing import Union, Mapping
 
 class UIClient:
@@ -30,6 +29,8 @@ class UIClient:
 
         # Attach to Allure with a descriptive name and JSON content type
         try:
+            # Imported here so importing UIClient (e.g. from conftest) stays cheap
+            import allure
             allure.attach(
                 pretty_dict,
                 name=f"Page Data - {page_name}",
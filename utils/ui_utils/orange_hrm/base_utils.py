@@ -1,9 +1,67 @@
+import time
+
+from pages.orange_hrm.base_page import verify_pending_visuals
 from pages.orange_hrm.login_page import LoginPage
 
 
+class lazy_page:
+    """
+    Page object built on first access and cached on the utils instance.
+    Module mixins (LoginUtils, PIMUtils, ...) only declare the pages they use;
+    BaseUtils collects them from the whole MRO into page_registry.
+    """
+
+    def __init__(self, page_cls):
+        self.page_cls = page_cls
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        start = time.perf_counter()
+        page_obj = self.page_cls(obj.page)
+        obj.page_build_times[self.name] = round((time.perf_counter() - start) * 1000, 3)
+        # Instance attribute shadows this (non-data) descriptor from now on
+        obj.__dict__[self.name] = page_obj
+        return page_obj
+
+
+def _collect_pages(cls) -> dict:
+    # Walk every base, not just the first one that defines page_registry,
+    # so OrangeHRMUtils(LoginUtils, PIMUtils, LeaveUtils) sees all mixins' pages
+    registry = {}
+    for klass in reversed(cls.__mro__):
+        for name, attr in vars(klass).items():
+            if isinstance(attr, lazy_page):
+                registry[name] = attr.page_cls
+    return registry
+
+
 class BaseUtils:
+    page_registry = {}
+
+    login_page_obj = lazy_page(LoginPage)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.page_registry = _collect_pages(cls)
 
     def __init__(self,page):
         super().__init__()
         self.page = page
-        self.login_page_obj = LoginPage(self.page)
\ No newline at end of file
+        self.page_build_times = {}
+
+    def built_pages(self) -> list:
+        """
+        Page objects this instance has constructed so far (they are built lazily).
+        """
+        return [self.__dict__[name] for name in self.page_registry if name in self.__dict__]
+
+    def verify_pending_visuals(self):
+        verify_pending_visuals(self.built_pages())
+
+
+BaseUtils.page_registry = _collect_pages(BaseUtils)
\ No newline at end of file
@@ -2,6 +2,10 @@ from utils.ui_utils.orange_hrm.login_utils import LoginUtils
 
 
 class OrangeHRMUtils(LoginUtils):
+    """
+    Composes the OrangeHRM module mixins. New modules subclass BaseUtils
+    directly and are listed here, e.g. OrangeHRMUtils(LoginUtils, PIMUtils).
+    """
 
     def logout(self):
         self.login_page_obj.user_dropdown_click()
@@ -0,0 +1,209 @@
+import hashlib
+import itertools
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.config_reader import get_config_value, get_path
+
+_pool = None
+_capture_ids = itertools.count()
+
+
+def visual_paths(name: str) -> dict:
+    """
+    :param name: str : logical name of the visual check
+    :return: dict : baseline / actual / diff png paths for the check
+    The baseline is keyed on name only; captures and diffs also carry the current test
+    and a per-process counter, so parallel workers, parametrized cases and repeated
+    queued checks never overwrite a capture before its background compare reads it.
+    """
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+    nodeid = os.environ.get("PYTEST_CURRENT_TEST", "").rsplit(" (", 1)[0]
+    capture = hashlib.sha1(f"{nodeid}|{os.getpid()}".encode()).hexdigest()[:10]
+    capture = f"{safe_name}_{capture}_{next(_capture_ids)}"
+    baseline_dir = get_path("baseline_dir")
+    output_dir = get_path("visual_diff_dir")
+    os.makedirs(baseline_dir, exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
+    return {
+        "baseline": os.path.join(baseline_dir, f"{safe_name}.png"),
+        "actual": os.path.join(output_dir, f"{capture}_actual.png"),
+        "diff": os.path.join(output_dir, f"{capture}_diff.png"),
+    }
+
+
+def compare_settings() -> dict:
+    return {
+        "channel_tolerance": int(get_config_value("VISUAL", "channel_tolerance")),
+        "max_diff_ratio": float(get_config_value("VISUAL", "max_diff_ratio")),
+        "antialias": get_config_value("VISUAL", "antialias_mask").lower() == "true",
+        "phash_skip_distance": int(get_config_value("VISUAL", "phash_skip_distance")),
+    }
+
+
+# ----------------------
+# Image helpers
+# ----------------------
+def _load_rgb(path: str) -> np.ndarray:
+    # Pillow is only used for PNG decode/encode, all comparison math is numpy
+    from PIL import Image
+    with Image.open(path) as img:
+        return np.asarray(img.convert("RGB"), dtype=np.int16)
+
+
+def _save_rgb(arr: np.ndarray, path: str):
+    from PIL import Image
+    Image.fromarray(arr.astype(np.uint8), mode="RGB").save(path)
+
+
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _grayscale(img: np.ndarray) -> np.ndarray:
+    return img[..., 0] * 0.299 + img[..., 1] * 0.587 + img[..., 2] * 0.114
+
+
+def perceptual_hash(img: np.ndarray, size: int = 16):
+    """
+    Difference hash: block-mean downscale to size x (size + 1) and compare
+    horizontal neighbours. Returns a flat bool array of size * size bits,
+    or None for images too narrow to have horizontal neighbours.
+    """
+    if img.shape[0] < 1 or img.shape[1] < 2:
+        return None
+    gray = _grayscale(img)
+    # Tiny element screenshots get a smaller hash instead of empty blocks
+    size = max(1, min(size, gray.shape[0], gray.shape[1] - 1))
+    rows = np.linspace(0, gray.shape[0], size + 1).astype(int)[:-1]
+    cols = np.linspace(0, gray.shape[1], size + 2).astype(int)[:-1]
+    sums = np.add.reduceat(np.add.reduceat(gray, rows, axis=0), cols, axis=1)
+    counts = np.outer(np.diff(np.append(rows, gray.shape[0])), np.diff(np.append(cols, gray.shape[1])))
+    small = sums / counts
+    return (small[:, 1:] > small[:, :-1]).ravel()
+
+
+def _neighbourhood_range(img: np.ndarray):
+    """
+    Per-channel min and max over each pixel's 3x3 neighbourhood.
+    """
+    padded = np.pad(img, ((1, 1), (1, 1), (0, 0)), mode="edge")
+    h, w = img.shape[:2]
+    low = img.copy()
+    high = img.copy()
+    for dy in range(3):
+        for dx in range(3):
+            shifted = padded[dy:dy + h, dx:dx + w]
+            np.minimum(low, shifted, out=low)
+            np.maximum(high, shifted, out=high)
+    return low, high
+
+
+def _antialias_mask(baseline: np.ndarray, actual: np.ndarray, tolerance: int) -> np.ndarray:
+    """
+    A pixel counts as anti-aliasing when each image's value is a blend of the other
+    image's neighbourhood, i.e. an edge moved by a sub-pixel rather than changed.
+    """
+    base_low, base_high = _neighbourhood_range(baseline)
+    act_low, act_high = _neighbourhood_range(actual)
+    actual_in_base = ((actual >= base_low - tolerance) & (actual <= base_high + tolerance)).all(axis=2)
+    base_in_actual = ((baseline >= act_low - tolerance) & (baseline <= act_high + tolerance)).all(axis=2)
+    on_edge = ((base_high - base_low) > 4 * tolerance).any(axis=2)
+    return actual_in_base & base_in_actual & on_edge
+
+
+# ----------------------
+# Comparison
+# ----------------------
+def compare_images(baseline_path: str, actual_path: str, diff_path: str, channel_tolerance: int = 16,
+                   max_diff_ratio: float = 0.001, antialias: bool = True, phash_skip_distance: int = -1) -> dict:
+    """
+    Compares actual screenshot against baseline. Runs in worker processes, so it
+    only takes/returns plain values.
+    Stages: byte digest -> exact pixel match -> perceptual hash (opt-in) -> vectorized per-channel pixel diff.
+    The hash is blind to small text/colour changes, so phash_skip_distance >= 0 trades
+    accuracy for speed and should only be enabled for pages known to be noisy.
+    """
+    result = {
+        "baseline": baseline_path, "actual": actual_path, "diff": None,
+        "status": "passed", "diff_pixels": 0, "diff_ratio": 0.0, "hash_distance": None,
+    }
+
+    if _file_digest(baseline_path) == _file_digest(actual_path):
+        result["status"] = "identical"
+        return result
+
+    baseline = _load_rgb(baseline_path)
+    actual = _load_rgb(actual_path)
+    if baseline.shape != actual.shape:
+        result.update(status="failed", diff_ratio=1.0,
+                      reason=f"size mismatch {baseline.shape[1::-1]} vs {actual.shape[1::-1]}")
+        return result
+
+    if np.array_equal(baseline, actual):
+        # Same pixels, only the PNG encoding differs
+        result["status"] = "identical"
+        return result
+
+    if phash_skip_distance >= 0:
+        base_hash, actual_hash = perceptual_hash(baseline), perceptual_hash(actual)
+        if base_hash is not None and actual_hash is not None:
+            distance = int(np.count_nonzero(base_hash != actual_hash))
+            result["hash_distance"] = distance
+            if distance <= phash_skip_distance:
+                result["status"] = "phash_match"
+                return result
+
+    mismatch = (np.abs(baseline - actual) > channel_tolerance).any(axis=2)
+    aa_pixels = np.zeros_like(mismatch)
+    if antialias and mismatch.any():
+        aa_pixels = mismatch & _antialias_mask(baseline, actual, channel_tolerance)
+        mismatch &= ~aa_pixels
+
+    diff_pixels = int(np.count_nonzero(mismatch))
+    result["diff_pixels"] = diff_pixels
+    result["diff_ratio"] = diff_pixels / mismatch.size
+    if result["diff_ratio"] <= max_diff_ratio:
+        return result
+
+    # Faded baseline, real differences in red, ignored anti-aliasing in yellow
+    faded = (_grayscale(baseline) * 0.3 + 178).astype(np.int16)
+    diff_img = np.repeat(faded[..., None], 3, axis=2)
+    diff_img[aa_pixels] = (255, 200, 0)
+    diff_img[mismatch] = (255, 0, 0)
+    _save_rgb(diff_img, diff_path)
+    result.update(status="failed", diff=diff_path)
+    return result
+
+
+# ----------------------
+# Background pool
+# ----------------------
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        workers = int(get_config_value("VISUAL", "workers"))
+        if workers <= 0:
+            # Every xdist worker owns a pool, so share the CPUs between them
+            xdist_workers = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", "1"))
+            workers = max(1, (os.cpu_count() or 1) // xdist_workers)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+def submit_compare(baseline_path: str, actual_path: str, diff_path: str):
+    """
+    Queues a comparison on the background process pool, returns a Future.
+    """
+    return get_pool().submit(compare_images, baseline_path, actual_path, diff_path, **compare_settings())
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None